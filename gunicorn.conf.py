@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for production.
+
+The app is imported once in the master (``preload_app``) and forked, so
+workers start fast and share memory; anything that holds sockets or threads
+(MongoDB clients, the LLM provider's HTTP clients) is dropped after the fork
+and rebuilt lazily inside each worker. ``gthread`` workers let a request that
+waits on OpenAI hold one thread instead of a whole worker process.
+
+Every setting can be overridden from the environment.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+preload_app = True
+
+# Long enough for a daily sentence set generated on the spot
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers now and then so slow leaks never add up
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = 200
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    from vocab_mate.llm import reset_provider
+    from vocab_mate.mongo import reset_client
+
+    # Connections opened in the master while preloading must not be shared between processes
+    connections.close_all()
+    reset_client()
+    reset_provider()
@@ -80,10 +80,41 @@ DATABASES = {
             'password': os.getenv('MONGODB_PASSWORD', ''),
             'authSource': os.getenv('MONGODB_AUTH_SOURCE', 'admin'),
             'authMechanism': os.getenv('MONGODB_AUTH_MECHANISM', 'SCRAM-SHA-1'),
-        }
+            # Pool and timeouts, per client; see "Production Serving" in the README
+            'maxPoolSize': int(os.getenv('MONGODB_MAX_POOL_SIZE', '50')),
+            'minPoolSize': int(os.getenv('MONGODB_MIN_POOL_SIZE', '0')),
+            'maxIdleTimeMS': int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '300000')),
+            'serverSelectionTimeoutMS': int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+            'connectTimeoutMS': int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '5000')),
+            'socketTimeoutMS': int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', '30000')),
+            'waitQueueTimeoutMS': int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+        },
+        # Keep each thread's connection (and djongo's client with it) across requests
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', '60')),
     }
 }
 
+# Serve the hot reads (word list/detail, progress list, stats) through
+# ``vocab_mate.repositories`` instead of the ORM
+FAST_READ_PATH = os.getenv('FAST_READ_PATH', 'True').lower() in ('true', '1', 'yes', 'on')
+
+# Serve daily sentences, stats and the progress list from the async views in
+# ``vocab_mate.async_views``; ``vocab_mate/asgi.py`` turns this on and refuses to start without it
+ASYNC_VIEWS = os.getenv('VOCAB_MATE_ASYNC_VIEWS', 'False').lower() in ('true', '1', 'yes', 'on')
+
+# Cache for daily sentences, counters and word responses. Local memory by default;
+# point it at memcached or Redis (e.g. CACHE_BACKEND=django_redis.cache.RedisCache,
+# CACHE_LOCATION=redis://localhost:6379/0) to share it between processes
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'vocab-mate'),
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', '300')),
+    }
+}
+# Seconds a cached word list/detail response is kept (see ``vocab_mate.caching``)
+WORD_RESPONSE_CACHE_TIMEOUT = int(os.getenv('WORD_RESPONSE_CACHE_TIMEOUT', '300'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -117,10 +148,20 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# How a JWT becomes request.user (see ``vocab_mate.authentication``):
+# database (load the user every request), claims (from the token alone) or cached
+JWT_AUTHENTICATION_CLASSES = {
+    'database': 'rest_framework_simplejwt.authentication.JWTAuthentication',
+    'claims': 'vocab_mate.authentication.ClaimsJWTAuthentication',
+    'cached': 'vocab_mate.authentication.CachedUserJWTAuthentication',
+}
+JWT_AUTHENTICATION = os.getenv('JWT_AUTHENTICATION', 'database')
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '30'))  # seconds, for "cached"
+
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        JWT_AUTHENTICATION_CLASSES[JWT_AUTHENTICATION],
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -134,6 +175,15 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Budgets of the public daily-sentence endpoints (see ``vocab_mate.throttling``)
+    'DEFAULT_THROTTLE_RATES': {
+        'daily_sentences': os.getenv('DAILY_SENTENCES_RATE', '30/min'),  # requests per client IP
+        'llm_calls_per_ip': os.getenv('LLM_CALLS_PER_IP', '10/hour'),
+        'llm_calls_global': os.getenv('LLM_CALLS_GLOBAL', '100/day'),
+    },
+    # Proxies in front of the app, whose X-Forwarded-For entries can be trusted (the Procfile
+    # sets 1 for Render). 0 uses REMOTE_ADDR, so clients cannot pick their own address.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
 # CORS settings
@@ -155,6 +205,14 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# LLM provider for sentence generation: openai, fake (local, for load tests) or replay
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'openai')
+LLM_RECORD_PATH = os.getenv('LLM_RECORD_PATH', '')  # append every reply to this JSONL file
+LLM_REPLAY_PATH = os.getenv('LLM_REPLAY_PATH', '')
+LLM_FAKE_LATENCY = float(os.getenv('LLM_FAKE_LATENCY', '0'))
+LLM_FAKE_OUTPUT_SIZE = int(os.getenv('LLM_FAKE_OUTPUT_SIZE', '0')) or None
+LLM_FAKE_MALFORMED_RATE = float(os.getenv('LLM_FAKE_MALFORMED_RATE', '0'))
+
 # drf-spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'VocabMate API',
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VocabMateConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vocab_mate'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -4,8 +4,19 @@ ASGI config for vocab_mate project.
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+from django.core.exceptions import ImproperlyConfigured
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'root.settings')
+# Under ASGI the I/O-bound endpoints must use the async views
+os.environ.setdefault('VOCAB_MATE_ASYNC_VIEWS', 'True')
+
+if not settings.ASYNC_VIEWS:
+    # The sync views stream sync iterators and run their own event loops, which
+    # Django 3.2's ASGI handler cannot serve
+    raise ImproperlyConfigured(
+        "VOCAB_MATE_ASYNC_VIEWS must be on under ASGI; run vocab_mate.wsgi to serve the sync views."
+    )
 
 application = get_asgi_application()
@@ -0,0 +1,191 @@
+"""
+Async versions of the I/O-bound endpoints, for ASGI deployments.
+
+DRF views are synchronous, so under an ASGI server each of them holds a worker
+thread for its whole Mongo round trip, or OpenAI round trip for the daily
+sentences. These plain Django async views await motor and the async LLM
+client instead, so one process can keep thousands of slow requests in flight.
+Responses are the same as from the DRF views in ``views.py``, which stay the
+code path for WSGI deployments. ``urls.py`` picks these when
+``settings.ASYNC_VIEWS`` is on, which ``asgi.py`` does by default.
+
+Django 3.2's ASGI handler iterates a ``StreamingHttpResponse`` on the event
+loop, where the ORM and pymongo calls of the streaming views would raise
+``SynchronousOnlyOperation`` (and the LLM stream would block the loop). Under
+ASGI the sentence stream is therefore sent in one piece once the set is ready,
+and exports are written to a temporary file in a worker thread first. Only
+WSGI deployments stream them as they are produced.
+"""
+import json
+import math
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed, JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .daily_sentences import DailySentenceStore, DailySentencesUnavailable
+from .mongo import async_database
+from .pagination import UserProgressPagination
+from .profiles import aread_counters
+from .repositories import ProgressRepository
+from .serializers import UserProgressSerializer
+from .stats import aprogress_breakdown, aword_count
+from .throttling import AsyncSingleFlight, LLMCostThrottle, flight_key
+from .views import ExportView, UserProgressListCreateView
+
+# Writes to the progress list still go through the DRF view
+sync_progress_list = UserProgressListCreateView.as_view()
+sync_exports = {name: ExportView.as_view(export=name) for name in ('words', 'progress')}
+
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # bytes of an export kept in memory before spilling to disk
+
+
+def _json(data, status=200):
+    # DRF renders non-ASCII text as is; so do we
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+
+async def _authenticate(request):
+    """
+    Wrap ``request`` for DRF and authenticate it with the configured classes.
+
+    Returns ``(drf_request, None)``, or ``(None, error_response)`` when the
+    credentials are missing or invalid.
+    """
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        # Authenticators may read the user from the database
+        user = await sync_to_async(lambda: drf_request.user)()
+    except exceptions.APIException as exc:
+        return None, _json({'detail': str(exc.detail)}, status=exc.status_code)
+    if not user or not user.is_authenticated:
+        return None, _json(
+            {'detail': str(exceptions.NotAuthenticated.default_detail)},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    return drf_request, None
+
+
+daily_flights = AsyncSingleFlight()
+
+
+async def _daily_set(request):
+    """
+    Throttle like the DRF daily-sentence views, then return ``(content, None)``
+    for today's set, or ``(None, error_response)``.
+    """
+    store = DailySentenceStore()
+    key = flight_key(request)
+
+    throttle = LLMCostThrottle()
+    llm_calls = 0 if daily_flights.in_flight(key) else await store.allm_calls_needed()
+    if not throttle.allow_costs(throttle.costs(throttle.get_ident(request), llm_calls)):
+        exc = exceptions.Throttled(throttle.wait())
+        response = _json({'detail': str(exc.detail)}, status=exc.status_code)
+        response['Retry-After'] = str(math.ceil(throttle.wait()))
+        return None, response
+
+    try:
+        # Identical requests arriving during a generation share its result
+        return await daily_flights.do(key, store.aget_or_generate), None
+    except DailySentencesUnavailable as ex:
+        return None, _json({'error': str(ex)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+async def daily_sentences(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    content, error = await _daily_set(request)
+    return error or _json(content)
+
+
+async def stream_daily_sentences(request):
+    """The NDJSON events of ``StreamDailySentencesView``, sent once the whole set is ready."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    content, error = await _daily_set(request)
+    if error:
+        return error
+    lines = ''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in DailySentenceStore._events(content))
+    response = HttpResponse(lines, content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _spooled_export(request, name):
+    response = sync_exports[name](request)
+    if not response.streaming:
+        return response.render()  # an error from the DRF view
+
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        for chunk in response.streaming_content:
+            body.write(chunk)
+    except BaseException:
+        body.close()
+        raise
+    finally:
+        response.close()
+    body.seek(0)
+
+    spooled = FileResponse(body, content_type=response['Content-Type'])
+    spooled['Content-Disposition'] = response['Content-Disposition']
+    return spooled
+
+
+def export_view(name):
+    """The async stand-in for ``ExportView.as_view(export=name)``."""
+    async def export(request):
+        # Reading the file back on the event loop is plain local I/O
+        return await sync_to_async(_spooled_export)(request, name)
+
+    # Set by hand, as for progress_list below
+    export.csrf_exempt = True
+    return export
+
+
+async def user_stats(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    drf_request, error = await _authenticate(request)
+    if error:
+        return error
+
+    db = async_database()
+    user_id = drf_request.user.id
+    total_words = await aword_count(db)
+    counters = await aread_counters(user_id, db)
+    learned_words, in_progress = counters if counters is not None else await aprogress_breakdown(user_id, db)
+
+    return _json({
+        'total_words': total_words,
+        'learned_words': learned_words,
+        'in_progress': in_progress,
+        'completion_percentage': round((learned_words / total_words * 100), 2) if total_words > 0 else 0
+    })
+
+
+async def progress_list(request):
+    if request.method != 'GET':
+        return await sync_to_async(lambda: sync_progress_list(request).render())()
+    drf_request, error = await _authenticate(request)
+    if error:
+        return error
+
+    paginator = UserProgressPagination()
+    repository = ProgressRepository()
+    try:
+        page = await paginator.apaginate_documents(repository, repository.list_query(drf_request.user.id), drf_request)
+    except exceptions.APIException as exc:  # an invalid cursor
+        return _json({'detail': str(exc.detail)}, status=exc.status_code)
+    await repository.aattach_words(page)
+    data = UserProgressSerializer(page, many=True, context={'request': drf_request}).data
+    return _json(paginator.get_paginated_data(data))
+
+
+# Like the DRF view it stands in for: clients authenticate with tokens, not cookies.
+# (Set by hand: ``csrf_exempt`` would wrap the coroutine function in a sync one.)
+progress_list.csrf_exempt = True
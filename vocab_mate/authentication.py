@@ -0,0 +1,71 @@
+"""
+JWT authentication without a ``User`` query on every request.
+
+simplejwt's ``JWTAuthentication`` loads the user row through djongo before
+every view runs. ``settings.JWT_AUTHENTICATION`` picks one of two lighter
+classes instead:
+
+- ``claims``: ``ClaimsJWTAuthentication`` builds a ``TokenUser`` from the
+  signed token alone. Tokens from ``ClaimsRefreshToken`` (what login and
+  registration issue) carry the username and staff flags it needs. A
+  deactivated or demoted user keeps access until the token expires.
+- ``cached``: ``CachedUserJWTAuthentication`` loads the real user at most once
+  per ``AUTH_USER_CACHE_TTL`` seconds per process. Saving or deleting a user
+  drops the entry in this process at once; other processes notice when it expires.
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .translation_cache import LRUCache
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """A refresh token (and the access tokens made from it) carrying the claims of a ``TokenUser``."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.get_username()
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Authenticate from the token's signed claims alone."""
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return TokenUser(validated_token)
+
+
+_users = LRUCache(maxsize=10000)
+
+
+def forget_user(user_id):
+    _users.set(user_id, None)
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """Authenticate with the real ``User``, loaded at most once per TTL."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        entry = _users.get(user_id)
+        now = time.monotonic()
+        if entry is None or entry[1] < now:
+            # Also rejects unknown and inactive users
+            user = super().get_user(validated_token)
+            entry = (user, now + settings.AUTH_USER_CACHE_TTL)
+            _users.set(user_id, entry)
+        # Requests must not share one mutable instance
+        return copy.copy(entry[0])
@@ -0,0 +1,74 @@
+"""
+Versioned response cache and conditional GET for the word endpoints.
+
+The vocabulary changes rarely, yet every client reloads it. Word list and
+detail responses are cached under their full URL plus a vocabulary version
+stamp. Every word create/update/delete (the ``Word`` signals) and every bulk
+import bumps the stamp, so stale entries are never looked up again and simply
+expire. Each cached response carries a strong ETag, a hash of its content,
+and a matching ``If-None-Match`` gets an empty 304.
+
+The cache is ``settings.CACHES['default']``. With the default local-memory
+backend each process has its own stamp, so other processes may serve the old
+vocabulary until ``WORD_RESPONSE_CACHE_TIMEOUT``; a shared backend
+(memcached, Redis) makes invalidation immediate everywhere.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'words:version'
+RESPONSE_KEY = 'words:response:{version}:{url}'
+
+
+def vocabulary_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Never restart from a number used before the key was evicted: old entries would come back
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_vocabulary_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def _etag(data):
+    content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+    return '"%s"' % hashlib.sha256(content.encode()).hexdigest()
+
+
+def _response_key(request):
+    # Paginated responses embed absolute links, so the host is part of the key too
+    url = hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()
+    return RESPONSE_KEY.format(version=vocabulary_version(), url=url)
+
+
+class CachedResponseMixin:
+    """Serve ``GET`` from the versioned response cache, with a strong ETag and 304s."""
+
+    def get(self, request, *args, **kwargs):
+        key = _response_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = {'data': response.data, 'etag': _etag(response.data)}
+            cache.set(key, entry, settings.WORD_RESPONSE_CACHE_TIMEOUT)
+
+        headers = {'ETag': entry['etag'], 'Cache-Control': 'private, no-cache'}
+        if entry['etag'] in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry['data'], headers=headers)
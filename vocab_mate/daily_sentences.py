@@ -0,0 +1,390 @@
+"""
+Per-day store for the daily sentence set.
+
+The set for a date is produced once, by the first request of the day or by the
+``generate_daily_sentences`` management command, and every later request that
+day is served from the cache (or the ``DailySentence`` rows served on that date).
+Producing a set claims pre-generated sentences from the inventory filled by
+``prefill_sentences`` and only falls back to the LLM for whatever is missing.
+
+Only one process generates a date's set: the generation lock is a document in
+the ``daily_sentence_locks`` collection, so it holds across gunicorn workers and
+hosts whatever cache backend is configured.
+
+The ``a``-prefixed methods are the same for async views: reads go through
+motor, generation through the async LLM client, and waiting callers sleep on
+the event loop instead of holding a thread. The lock and poll logic is written
+once, as a generator of I/O steps that ``_run`` and ``_arun`` carry out.
+"""
+import asyncio
+import datetime
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from pymongo.errors import DuplicateKeyError
+
+from .generate_sentence import DailySentenceGenerator, sentence_hash, sentence_index
+from .models import DailySentence
+from .mongo import async_database, get_database
+
+LOCKS_COLLECTION = 'daily_sentence_locks'
+
+
+def ensure_lock_indexes(db):
+    """Let MongoDB drop generation locks left behind by a crashed process."""
+    db[LOCKS_COLLECTION].create_index('expires_at', name='expires_at_ttl', expireAfterSeconds=0)
+
+
+class DailySentencesUnavailable(Exception):
+    """Raised when the set for a date could not be produced in time."""
+
+
+class DailySentenceStore:
+    """Serve the sentence set for a date, generating it at most once."""
+
+    cache_prefix = 'daily-sentences'
+    lock_timeout = 180  # seconds a generation may hold the lock
+    wait_timeout = 120  # seconds a caller waits for someone else's generation
+    poll_interval = 0.25
+
+    _local_locks = {}
+    _local_locks_guard = threading.Lock()
+    _async_locks = {}
+
+    def __init__(self, count=20, generator_class=DailySentenceGenerator):
+        self.count = count
+        self.generator_class = generator_class
+
+    def _key(self, date, suffix='set'):
+        return f"{self.cache_prefix}:{date}:{suffix}"
+
+    def _local_lock(self, date):
+        """Threads of this process share one lock per date."""
+        with self._local_locks_guard:
+            return self._local_locks.setdefault(str(date), threading.Lock())
+
+    def _async_lock(self, date):
+        """Tasks of this event loop share one lock per date."""
+        return self._async_locks.setdefault(str(date), asyncio.Lock())
+
+    def _lock_document(self, date):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return {
+            '_id': str(date),
+            'owner': uuid.uuid4().hex,
+            'expires_at': now + datetime.timedelta(seconds=self.lock_timeout),
+        }
+
+    @staticmethod
+    def _expired(date):
+        return {'_id': str(date), 'expires_at': {'$lte': datetime.datetime.now(datetime.timezone.utc)}}
+
+    @staticmethod
+    def _held(date):
+        return {'_id': str(date), 'expires_at': {'$gt': datetime.datetime.now(datetime.timezone.utc)}}
+
+    def _acquire(self, date):
+        """
+        Take the generation lock for ``date`` across all processes; returns the
+        owner token, or ``None`` while someone else holds it.
+        """
+        locks = get_database()[LOCKS_COLLECTION]
+        # The TTL monitor only runs once a minute; an expired lock is free right away
+        locks.delete_one(self._expired(date))
+        document = self._lock_document(date)
+        try:
+            locks.insert_one(document)
+        except DuplicateKeyError:
+            return None
+        return document['owner']
+
+    def _release(self, date, owner):
+        # Only our own lock: after a timeout it may belong to someone else
+        get_database()[LOCKS_COLLECTION].delete_one({'_id': str(date), 'owner': owner})
+
+    def _locked(self, date):
+        return get_database()[LOCKS_COLLECTION].count_documents(self._held(date)) > 0
+
+    async def _aacquire(self, date):
+        locks = async_database()[LOCKS_COLLECTION]
+        await locks.delete_one(self._expired(date))
+        document = self._lock_document(date)
+        try:
+            await locks.insert_one(document)
+        except DuplicateKeyError:
+            return None
+        return document['owner']
+
+    async def _arelease(self, date, owner):
+        await async_database()[LOCKS_COLLECTION].delete_one({'_id': str(date), 'owner': owner})
+
+    async def _alocked(self, date):
+        return await async_database()[LOCKS_COLLECTION].count_documents(self._held(date)) > 0
+
+    def _sleep(self):
+        time.sleep(self.poll_interval)
+
+    async def _asleep(self):
+        await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def _seconds_until_tomorrow():
+        now = datetime.datetime.now()
+        tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+        return max(int((tomorrow - now).total_seconds()), 1)
+
+    def _remember(self, date, payload):
+        cache.set(self._key(date), dict(payload, status="cached"), self._seconds_until_tomorrow())
+
+    def forget(self, date):
+        """Drop the cached payload for ``date`` so the next read comes from the DB."""
+        cache.delete(self._key(date))
+
+    @staticmethod
+    def _served(date):
+        """Filter, projection and sort of the rows served on ``date``."""
+        # DateField values are stored as midnight datetimes
+        return (
+            {'served_on': datetime.datetime.combine(date, datetime.time.min)},
+            {'_id': 0, 'hindi': 1, 'english': 1, 'german': 1},
+            [('id', 1)],
+        )
+
+    def _stored_payload(self, date, sentences):
+        """Build and cache the payload for the rows served on ``date``; ``None`` when there are none."""
+        if not sentences:
+            return None
+        sentence_index.refresh()
+        payload = {
+            "date": str(date),
+            "sentences": sentences,
+            "status": "cached",
+            "total_sentences_in_db": len(sentence_index),
+        }
+        self._remember(date, payload)
+        return payload
+
+    def load(self, date):
+        """Return the stored payload for ``date``, or ``None`` if it was not generated yet."""
+        payload = cache.get(self._key(date))
+        if payload is not None:
+            return payload
+        query, projection, sort = self._served(date)
+        sentences = list(get_database()[DailySentence._meta.db_table].find(query, projection, sort=sort))
+        return self._stored_payload(date, sentences)
+
+    async def aload(self, date):
+        payload = cache.get(self._key(date))
+        if payload is not None:
+            return payload
+        query, projection, sort = self._served(date)
+        cursor = async_database()[DailySentence._meta.db_table].find(query, projection, sort=sort)
+        sentences = [sentence async for sentence in cursor]
+        return await sync_to_async(self._stored_payload)(date, sentences)
+
+    def inventory_size(self):
+        return DailySentence.objects.filter(prefilled=True, served_on__isnull=True).count()
+
+    def _llm_calls(self, inventory, streaming):
+        missing = self.count - inventory
+        return self.generator_class.estimated_llm_calls(missing, streaming) if missing > 0 else 0
+
+    def llm_calls_needed(self, streaming=False):
+        """
+        LLM calls a request would start now: none once today's set is stored or
+        while another caller generates it, otherwise enough for the shortfall
+        the inventory cannot cover.
+        """
+        today = datetime.date.today()
+        if self.load(today) is not None or self._locked(today):
+            return 0
+        return self._llm_calls(self.inventory_size(), streaming)
+
+    async def allm_calls_needed(self):
+        today = datetime.date.today()
+        if await self.aload(today) is not None or await self._alocked(today):
+            return 0
+        return self._llm_calls(await sync_to_async(self.inventory_size)(), False)
+
+    def _inventory(self):
+        return DailySentence.objects.filter(prefilled=True, served_on__isnull=True).order_by('id')
+
+    def claim(self, date, hashes):
+        """
+        Mark the given inventory sentences as served on ``date`` in one update.
+
+        The update only touches rows that are still unclaimed, so a row can never
+        end up in two days' sets, and the set becomes visible all at once.
+        """
+        if hashes:
+            DailySentence.objects.filter(hash__in=hashes, served_on__isnull=True).update(served_on=date)
+
+    def _inventory_hashes(self):
+        return list(self._inventory().values_list('hash', flat=True)[:self.count])
+
+    def _claim_set(self, date, hashes, result):
+        """Claim the inventory ``hashes`` plus the generator's ``result`` (if any) as the set for ``date``."""
+        status = "from_inventory"
+        if result is not None:
+            hashes = hashes + [sentence_hash(s["english"]) for s in result["sentences"]]
+            status = result["status"]
+        self.claim(date, hashes)
+
+        payload = self.load(date)
+        if payload is None:
+            return {"date": str(date), "sentences": [], "status": status, "total_sentences_in_db": len(sentence_index)}
+        return dict(payload, status=status)
+
+    def _produce(self, date):
+        """Claim today's set from the inventory, generating only the shortfall."""
+        hashes = self._inventory_hashes()
+        result = None
+        if len(hashes) < self.count:
+            result = self.generator_class(count=self.count - len(hashes)).generate_daily(serve=False)
+        return self._claim_set(date, hashes, result)
+
+    async def _aproduce(self, date):
+        hashes = await sync_to_async(self._inventory_hashes)()
+        result = None
+        if len(hashes) < self.count:
+            generator = self.generator_class(count=self.count - len(hashes), pipeline=True)
+            result = await generator.agenerate_daily(serve=False)
+        return await sync_to_async(self._claim_set)(date, hashes, result)
+
+    def _generate_once(self, date):
+        """
+        Wait for the MongoDB lock (or for whoever holds it to store the set),
+        then produce the set for ``date`` unless it appeared meanwhile.
+
+        Yields ``(method_name, *args)`` for each I/O step and receives its
+        result; ``_run`` and ``_arun`` carry the steps out.
+        """
+        payload = yield ('load', date)
+        if payload is not None:
+            return payload
+
+        deadline = time.monotonic() + self.wait_timeout
+        owner = yield ('_acquire', date)
+        while owner is None:
+            if time.monotonic() >= deadline:
+                raise DailySentencesUnavailable("Daily sentences are still being generated, try again shortly.")
+            yield ('_sleep',)
+            payload = yield ('load', date)
+            if payload is not None:
+                return payload
+            owner = yield ('_acquire', date)
+
+        try:
+            payload = yield ('load', date)
+            if payload is not None:
+                return payload
+            return (yield ('_produce', date))
+        finally:
+            yield ('_release', date, owner)
+
+    def _run(self, steps):
+        """Carry out the steps of ``steps`` with the blocking methods; returns its result."""
+        result = error = None
+        while True:
+            try:
+                name, *args = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                result, error = getattr(self, name)(*args), None
+            except BaseException as exc:  # thrown back in, so the lock is released on any exit
+                result, error = None, exc
+
+    async def _arun(self, steps):
+        """``_run`` with the ``a``-prefixed methods."""
+        result = error = None
+        while True:
+            try:
+                name, *args = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            prefix = name[:len(name) - len(name.lstrip('_'))]
+            try:
+                result, error = await getattr(self, prefix + 'a' + name[len(prefix):])(*args), None
+            except BaseException as exc:
+                result, error = None, exc
+
+    def get_or_generate(self):
+        """
+        Return today's set, generating it if needed.
+
+        Concurrent callers in this process queue on a per-date lock and other
+        processes on the MongoDB lock, so only one generation runs per day;
+        everyone else picks up its result.
+        """
+        today = datetime.date.today()
+        payload = self.load(today)
+        if payload is not None:
+            return payload
+        with self._local_lock(today):
+            return self._run(self._generate_once(today))
+
+    async def aget_or_generate(self):
+        """``get_or_generate`` for async views."""
+        today = datetime.date.today()
+        payload = await self.aload(today)
+        if payload is not None:
+            return payload
+        async with self._async_lock(today):
+            return await self._arun(self._generate_once(today))
+
+    @staticmethod
+    def _events(payload):
+        yield {"type": "meta", "date": payload["date"], "status": payload["status"]}
+        for sentence in payload["sentences"]:
+            yield dict(sentence, type="sentence")
+        yield {"type": "done", "count": len(payload["sentences"]), "total_sentences_in_db": payload["total_sentences_in_db"]}
+
+    def _stream_new(self, date):
+        """Stream inventory sentences, then freshly generated ones, and claim them all at the end."""
+        payload = self.load(date)
+        if payload is not None:
+            yield from self._events(payload)
+            return
+
+        yield {"type": "meta", "date": str(date), "status": "streaming"}
+        hashes = []
+        for row in self._inventory().values('hindi', 'english', 'german', 'hash')[:self.count]:
+            hashes.append(row.pop('hash'))
+            yield dict(row, type="sentence")
+        if len(hashes) < self.count:
+            for sentence in self.generator_class(count=self.count - len(hashes)).stream_daily():
+                hashes.append(sentence_hash(sentence["english"]))
+                yield dict(sentence, type="sentence")
+
+        # A client that disconnects earlier leaves its sentences in the inventory
+        self.claim(date, hashes)
+        yield {"type": "done", "count": len(hashes), "total_sentences_in_db": len(sentence_index)}
+
+    def stream(self):
+        """
+        Yield today's set as events (``meta``, one ``sentence`` each, ``done``).
+
+        The caller that wins the generation lock streams sentences as the model
+        writes them; anyone arriving meanwhile waits for the stored set instead.
+        """
+        today = datetime.date.today()
+        payload = self.load(today)
+        if payload is None:
+            local_lock = self._local_lock(today)
+            if local_lock.acquire(blocking=False):
+                try:
+                    owner = self._acquire(today)
+                    if owner is not None:
+                        try:
+                            yield from self._stream_new(today)
+                            return
+                        finally:
+                            self._release(today, owner)
+                finally:
+                    local_lock.release()
+            payload = self.get_or_generate()
+        yield from self._events(payload)
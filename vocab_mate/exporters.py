@@ -0,0 +1,76 @@
+"""
+Streaming NDJSON export of the ``words`` and ``user_progress`` collections.
+
+Documents are read through a server-side cursor a bounded batch at a time and
+written out as they arrive, optionally gzip-compressed, so memory stays flat
+however large the collection is. ``since`` limits the export to documents
+changed at or after that time (``updated_at`` for words, ``last_reviewed`` for
+progress), which is what incremental exports need.
+"""
+import json
+import zlib
+from datetime import date, datetime
+
+from bson import ObjectId
+
+from .mongo import get_database
+
+# name -> (collection, field recording the last change)
+EXPORTS = {
+    'words': ('words', 'updated_at'),
+    'progress': ('user_progress', 'last_reviewed'),
+}
+BATCH_SIZE = 1000
+# Lines are joined into chunks of about this many bytes before they are written
+CHUNK_SIZE = 64 * 1024
+
+
+def ensure_export_indexes(db=None):
+    """Index the change fields so ``since`` exports read only what changed."""
+    db = db or get_database()
+    for collection, changed_field in EXPORTS.values():
+        db[collection].create_index(changed_field, name=f'{changed_field}_export')
+
+
+def _encode(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def export_lines(name, since=None, query=None, batch_size=BATCH_SIZE, db=None):
+    """Yield the documents of export ``name`` as NDJSON, in chunks of bytes."""
+    collection, changed_field = EXPORTS[name]
+    query = dict(query or {})
+    if since is not None:
+        query[changed_field] = {'$gte': since}
+
+    cursor = (db or get_database())[collection].find(query).batch_size(batch_size)
+    try:
+        chunk = []
+        size = 0
+        for document in cursor:
+            line = (json.dumps(document, default=_encode, ensure_ascii=False) + '\n').encode()
+            chunk.append(line)
+            size += len(line)
+            if size >= CHUNK_SIZE:
+                yield b''.join(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            yield b''.join(chunk)
+    finally:
+        # Also runs when a client disconnects mid-download and the response is closed
+        cursor.close()
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of byte chunks incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,179 +1,462 @@
 # views.py
+import asyncio
 import hashlib
+import json
 import datetime
-import os
-from django.http import JsonResponse
+import logging
+import math
+import random
+import threading
+from collections import deque
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from openai import OpenAI
+from .llm import get_provider
+from .json_stream import JSONArrayStreamParser, parse_json_array
 from .models import DailySentence
+from .mongo import allocate_ids, get_database, insert_new
+from .translation_cache import translation_cache
+
+logger = logging.getLogger(__name__)
+
+
+INSERTS_COLLECTION = 'daily_sentence_inserts'
+
+
+def count_inserted_sentences(count, db=None):
+    """Add ``count`` to the number of sentences ever stored, which ``SentenceHashIndex`` checks itself against."""
+    if count:
+        (db or get_database())[INSERTS_COLLECTION].update_one({'_id': 'count'}, {'$inc': {'n': count}}, upsert=True)
+
+
+def inserted_sentences(db=None):
+    document = (db or get_database())[INSERTS_COLLECTION].find_one({'_id': 'count'})
+    return document['n'] if document else 0
+
+
+class SentenceHashIndex:
+    """
+    In-memory set of the ``DailySentence.hash`` values already stored.
+
+    The table stays the source of truth: each ``refresh()`` only pulls rows with
+    an id above the last one seen, so keeping the index current costs one small
+    query and one counter read per generation instead of reloading (or prompting
+    with) the whole table.
+    """
+
+    def __init__(self, recent_size=200):
+        self._hashes = set()
+        self._recent_english = deque(maxlen=recent_size)
+        self._last_id = 0
+        self._rows = 0  # rows pulled from the table
+        self._baseline = None  # inserted_sentences() minus _rows, as of the last full load
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            # Read the counter first: a row pulled before its insert is counted can
+            # only cause a spurious reload below, never a missed one
+            inserted = inserted_sentences()
+            self._pull(DailySentence.objects.filter(id__gt=self._last_id))
+            # Ids are reserved before the insert, so another process can store a lower
+            # range after we pulled past it; the counter then grew more than our rows
+            if self._baseline is not None and inserted - self._baseline > self._rows:
+                self._hashes.clear()
+                self._recent_english.clear()
+                self._last_id = self._rows = 0
+                self._pull(DailySentence.objects.all())
+                self._baseline = None
+            if self._baseline is None:
+                self._baseline = inserted - self._rows
+
+    def _pull(self, queryset):
+        for row_id, h, english in queryset.order_by('id').values_list('id', 'hash', 'english'):
+            self._hashes.add(h)
+            self._recent_english.append(english)
+            self._last_id = row_id
+            self._rows += 1
+
+    def add(self, h, english):
+        with self._lock:
+            self._hashes.add(h)
+            self._recent_english.append(english)
+
+    def __contains__(self, h):
+        return h in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def sample_recent(self, size):
+        """A bounded random sample of recent sentences for the prompt's avoid hint."""
+        with self._lock:
+            recent = list(self._recent_english)
+        return random.sample(recent, min(size, len(recent)))
+
+
+sentence_index = SentenceHashIndex()
+
+
+def sentence_hash(text: str):
+    """sha256 of the lower-cased sentence, the key used to detect duplicates."""
+    return hashlib.sha256(text.lower().encode()).hexdigest()
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 class DailySentenceGenerator:
-    def __init__(self, count=20):
+    avoid_hint_size = 30  # sentences quoted in the prompt, whatever the table size
+    overgenerate_factor = 1.5
+    max_rounds = 3
+
+    # Pipeline mode: large counts are split into chunks generated and translated concurrently.
+    # Chunks hold about chunk_size sentences, and grow up to max_chunk_size so that the
+    # whole count still fits in one wave of `concurrency` chunks.
+    chunk_size = 20
+    max_chunk_size = 40
+    concurrency = 4
+    chunk_timeout = 60  # seconds per OpenAI call
+    chunk_retries = 2
+
+    def __init__(self, count=20, index=None, pipeline=None, provider=None):
         self.count = count
+        self.index = index or sentence_index
+        self.provider = provider or get_provider()
+        # None picks pipeline mode automatically when the count spans several chunks
+        self.pipeline = count > self.chunk_size if pipeline is None else pipeline
+
+    @classmethod
+    def estimated_llm_calls(cls, count, streaming=False):
+        """LLM calls for ``count`` new sentences when the first round has no duplicates."""
+        if streaming:
+            return 1
+        # One call for the Hindi-English pairs and one for the German, per chunk
+        return 2 * len(cls.chunk_sizes(count))
+
+    @classmethod
+    def chunk_sizes(cls, count):
+        """Balanced chunk sizes for ``count`` sentences, in as few concurrent waves as possible."""
+        if count <= 0:
+            return []
+        chunks = math.ceil(count / cls.chunk_size)
+        if chunks > cls.concurrency:
+            chunks = max(cls.concurrency, math.ceil(count / cls.max_chunk_size))
+        size, extra = divmod(count, chunks)
+        return [size + 1] * extra + [size] * (chunks - extra)
 
     def _hash(self, text: str):
         """Generate hash to detect duplicates."""
-        return hashlib.sha256(text.lower().encode()).hexdigest()
+        return sentence_hash(text)
 
-    def _generate_hindi_english(self, existing_sentences):
-        """Ask OpenAI for Hindi-English pairs excluding previous ones."""
-        prompt = f"""
+    def _hindi_english_prompt(self, avoid_sentences, count):
+        return f"""
         You are a Hindi-English language teacher.
-        Generate {self.count} unique daily-use sentences.
+        Generate {count} unique daily-use sentences.
         Each should be a Hindi-English pair in JSON format:
         [{{"hindi": "...", "english": "..."}}]
 
-        Do not repeat any of these existing sentences:
-        {existing_sentences}
+        Avoid sentences like these, which were already used:
+        {avoid_sentences}
         Sentences should be simple and common in daily life, like greetings, eating, family, work, travel.
         
         IMPORTANT: Return ONLY valid JSON array, no other text or explanations.
         Example format: [{{"hindi": "नमस्ते", "english": "Hello"}}, {{"hindi": "धन्यवाद", "english": "Thank you"}}]
         """
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.8
-            )
-            content = response.choices[0].message.content.strip()
-            print(f"OpenAI Response: {content}")  # Debug print
-            
-            import json
-            import re
-            
-            # Extract JSON from the response - look for JSON array pattern
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                json_content = json_match.group(0)
-                # Clean up any markdown formatting
-                json_content = json_content.replace('```json', '').replace('```', '').strip()
-                sentences = json.loads(json_content)
-            else:
-                # Fallback: try to extract from markdown blocks
-                if '```json' in content:
-                    start = content.find('```json') + 7
-                    end = content.find('```', start)
-                    json_content = content[start:end].strip()
-                elif '```' in content:
-                    start = content.find('```') + 3
-                    end = content.find('```', start)
-                    json_content = content[start:end].strip()
-                else:
-                    json_content = content
-                
-                sentences = json.loads(json_content)
-            if not isinstance(sentences, list):
-                sentences = []
-        except Exception as ex:
-            print(f"Error generating sentences: {ex}")
-            sentences = []
-        return sentences
 
-    def _translate_to_german(self, english_sentences):
-        """Translate English sentences to German."""
-        prompt = f"""
+    def _german_prompt(self, english_sentences):
+        return f"""
         Translate these English sentences to German.
         Return JSON list of objects: [{{"english": "...", "german": "..."}}]
-        Sentences: {english_sentences}
+        Sentences: {json.dumps(english_sentences, ensure_ascii=False)}
         
         IMPORTANT: Return ONLY valid JSON array, no other text or explanations.
         Example format: [{{"english": "Hello", "german": "Hallo"}}, {{"english": "Thank you", "german": "Danke"}}]
         """
+
+    def _triple_prompt(self, avoid_sentences, count):
+        return f"""
+        You are a Hindi-English-German language teacher.
+        Generate {count} unique daily-use sentences.
+        Each should be a Hindi-English-German triple in JSON format:
+        [{{"hindi": "...", "english": "...", "german": "..."}}]
+
+        Avoid sentences like these, which were already used:
+        {avoid_sentences}
+        Sentences should be simple and common in daily life, like greetings, eating, family, work, travel.
+        
+        IMPORTANT: Return ONLY valid JSON array, no other text or explanations.
+        Example format: [{{"hindi": "नमस्ते", "english": "Hello", "german": "Hallo"}}]
+        """
+
+    def _generate_hindi_english(self, avoid_sentences, count=None):
+        """Ask OpenAI for Hindi-English pairs, steering away from a sample of previous ones."""
+        prompt = self._hindi_english_prompt(avoid_sentences, count or self.count)
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
-            )
-            content = response.choices[0].message.content.strip()
-            print(f"German Translation Response: {content}")  # Debug print
-            
-            import json
-            import re
-            
-            # Extract JSON from the response - look for JSON array pattern
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                json_content = json_match.group(0)
-                # Clean up any markdown formatting
-                json_content = json_content.replace('```json', '').replace('```', '').strip()
-                translated = json.loads(json_content)
-            else:
-                # Fallback: try to extract from markdown blocks
-                if '```json' in content:
-                    start = content.find('```json') + 7
-                    end = content.find('```', start)
-                    json_content = content[start:end].strip()
-                elif '```' in content:
-                    start = content.find('```') + 3
-                    end = content.find('```', start)
-                    json_content = content[start:end].strip()
-                else:
-                    json_content = content
-                
-                translated = json.loads(json_content)
-            
-            if not isinstance(translated, list):
-                translated = []
+            content = self.provider.complete(prompt, 0.8)
+            logger.debug("OpenAI response: %s", content)
+            sentences = parse_json_array(content)
+        except Exception as ex:
+            logger.warning("Error generating sentences: %s", ex)
+            sentences = []
+        return sentences
+
+    def _cached_german(self, english_sentences):
+        """Split sentences into ``({english: german}, misses)`` using the translation memo."""
+        hashes = {english: self._hash(english) for english in english_sentences}
+        cached = translation_cache.get_many(list(hashes.values()))
+        found = {english: cached[h] for english, h in hashes.items() if h in cached}
+        misses = [english for english in english_sentences if english not in found]
+        return found, misses
+
+    def _remember_german(self, requested, translated):
+        """Memoise the model's translations of ``requested``; returns ``{english: german}``."""
+        requested = set(requested)
+        fresh = {
+            t["english"]: t["german"] for t in translated
+            if isinstance(t, dict) and t.get("english") in requested and t.get("german")
+        }
+        translation_cache.set_many({
+            self._hash(english): (english, german) for english, german in fresh.items()
+        })
+        return fresh
+
+    def _translate_to_german(self, english_sentences):
+        """Translate English sentences to German, asking the model only for memo misses."""
+        found, misses = self._cached_german(english_sentences)
+        if misses:
+            found.update(self._remember_german(misses, self._request_german(misses)))
+        return [
+            {"english": english, "german": found[english]}
+            for english in english_sentences if english in found
+        ]
+
+    def _request_german(self, english_sentences):
+        """Ask OpenAI to translate English sentences to German."""
+        prompt = self._german_prompt(english_sentences)
+        try:
+            content = self.provider.complete(prompt, 0.7)
+            logger.debug("German translation response: %s", content)
+            translated = parse_json_array(content)
         except Exception as ex:
-            print(f"Error translating to German: {ex}")
+            logger.warning("Error translating to German: %s", ex)
             translated = []
         return translated
 
-    def generate_daily(self):
-        """Main logic to generate and save new unique sentences."""
-        today = datetime.date.today()
-        
-        # Step 1: Get existing sentence hashes to avoid repetition
-        existing_english = list(DailySentence.objects.values_list("english", flat=True))
-        
-        # Step 2: Generate Hindi-English pairs
-        hindi_english_pairs = self._generate_hindi_english(existing_english)
+    def _collect_unique_pairs(self):
+        """Generate pairs until ``count`` unseen ones are collected or the rounds run out."""
         unique_sentences = []
+        seen = set()
+        for _ in range(self.max_rounds):
+            missing = self.count - len(unique_sentences)
+            if missing <= 0:
+                break
+            avoid = self.index.sample_recent(self.avoid_hint_size)
+            pairs = self._generate_hindi_english(avoid, count=math.ceil(missing * self.overgenerate_factor))
+            unique_sentences.extend(self._take_unseen(pairs, seen, missing))
+        return unique_sentences
 
-        for s in hindi_english_pairs:
-            h = self._hash(s["english"])
-            if not DailySentence.objects.filter(hash=h).exists():
-                unique_sentences.append(s)
-            if len(unique_sentences) == self.count:
+    def _take_unseen(self, pairs, seen, limit):
+        """Keep well-formed pairs whose English is neither stored nor already taken this run."""
+        fresh = []
+        for s in pairs:
+            if len(fresh) == limit:
                 break
+            if not isinstance(s, dict) or not s.get("hindi") or not s.get("english"):
+                continue
+            h = self._hash(s["english"])
+            if h in seen or h in self.index:
+                continue
+            seen.add(h)
+            fresh.append(s)
+        return fresh
+
+    async def _acomplete(self, semaphore, prompt, temperature):
+        """One chat completion with a per-call timeout and retries; returns '' when all attempts fail."""
+        for attempt in range(self.chunk_retries + 1):
+            try:
+                async with semaphore:
+                    return await asyncio.wait_for(
+                        self.provider.acomplete(prompt, temperature),
+                        timeout=self.chunk_timeout
+                    )
+            except Exception as ex:
+                logger.warning("OpenAI chunk attempt %d failed: %s", attempt + 1, ex)
+                if attempt < self.chunk_retries:
+                    await asyncio.sleep(2 ** attempt)
+        return ""
+
+    async def _run_chunk(self, semaphore, size, seen):
+        """Generate one chunk of pairs and translate it as soon as it arrives."""
+        avoid = self.index.sample_recent(self.avoid_hint_size)
+        prompt = self._hindi_english_prompt(avoid, math.ceil(size * self.overgenerate_factor))
+        content = await self._acomplete(semaphore, prompt, 0.8)
+        pairs = self._take_unseen(parse_json_array(content), seen, size)
+        if not pairs:
+            return []
+
+        translated_dict, misses = await sync_to_async(self._cached_german)([s["english"] for s in pairs])
+        if misses:
+            content = await self._acomplete(semaphore, self._german_prompt(misses), 0.7)
+            translated_dict.update(
+                await sync_to_async(self._remember_german)(misses, parse_json_array(content))
+            )
+        return [
+            {"hindi": s["hindi"], "english": s["english"], "german": translated_dict.get(s["english"], "")}
+            for s in pairs
+        ]
 
-        # Step 3: Translate to German
+    async def _generate_pipeline(self):
+        """Generate ``count`` translated sentences in concurrent chunks."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        seen = set()
+        sentences = []
+        try:
+            for _ in range(self.max_rounds):
+                missing = self.count - len(sentences)
+                if missing <= 0:
+                    break
+                sizes = self.chunk_sizes(missing)
+                chunks = await asyncio.gather(
+                    *(self._run_chunk(semaphore, size, seen) for size in sizes)
+                )
+                for chunk in chunks:
+                    sentences.extend(chunk)
+        finally:
+            await self.provider.aclose()
+        return sentences[:self.count]
+
+    def stream_daily(self):
+        """
+        Yield new sentences one by one while the model is still writing the rest.
+
+        A single streamed completion returns Hindi, English and German together;
+        each object is deduplicated and yielded as soon as its closing brace
+        arrives. Everything yielded is stored in the inventory when the stream
+        ends, including when the client goes away halfway through.
+        """
+        self.index.refresh()
+        parser = JSONArrayStreamParser()
+        seen = set()
+        sentences = []
+        avoid = self.index.sample_recent(self.avoid_hint_size)
+        pieces = self.provider.stream(
+            self._triple_prompt(avoid, math.ceil(self.count * self.overgenerate_factor)), 0.8
+        )
+        try:
+            for delta in pieces:
+                for s in self._take_unseen(parser.feed(delta), seen, self.count - len(sentences)):
+                    sentence = {"hindi": s["hindi"], "english": s["english"], "german": s.get("german") or ""}
+                    sentences.append(sentence)
+                    yield sentence
+                if len(sentences) == self.count or parser.finished:
+                    break
+        except Exception as ex:
+            logger.warning("Error streaming sentences: %s", ex)
+        finally:
+            pieces.close()
+            self._remember_german(
+                [s["english"] for s in sentences],
+                [s for s in sentences if s["german"]]
+            )
+            self._save(sentences, None)
+
+    def _save(self, sentences, served_on):
+        """
+        Store ``sentences`` with one ``$in`` duplicate check and one bulk insert.
+
+        Sentences another run stored in the meantime are skipped rather than
+        failing the batch. ``served_on=None`` stores them as inventory. Returns
+        the sentences that were stored for ``served_on``.
+        """
+        if not sentences:
+            return []
+        by_hash = {self._hash(s["english"]): s for s in sentences}
+        existing = set(
+            DailySentence.objects.filter(hash__in=list(by_hash)).values_list("hash", flat=True)
+        )
+        # Inserted through pymongo: djongo turns duplicate keys into an opaque DatabaseError
+        today = datetime.datetime.combine(datetime.date.today(), datetime.time.min)
+        served = None if served_on is None else datetime.datetime.combine(served_on, datetime.time.min)
+        new = [h for h in by_hash if h not in existing]
+        documents = [
+            {
+                'id': row_id,
+                'date': today,  # DateField values are stored as midnight datetimes
+                'hindi': by_hash[h]["hindi"],
+                'english': by_hash[h]["english"],
+                'german': by_hash[h]["german"],
+                'hash': h,
+                'prefilled': served_on is None,
+                'served_on': served,
+            }
+            for row_id, h in zip(allocate_ids(DailySentence._meta.db_table, len(new)), new)
+        ]
+        inserted = insert_new(get_database()[DailySentence._meta.db_table], documents)
+        count_inserted_sentences(len(inserted))
+        saved = {document['hash'] for document in inserted}
+
+        for h in saved:
+            self.index.add(h, by_hash[h]["english"])
+        return [s for h, s in by_hash.items() if h in saved]
+
+    def _generate_sequential(self):
+        """Generate all pairs in one completion, then translate them in a second one."""
+        # Over-generate Hindi-English pairs and keep the ones we have not stored yet
+        unique_sentences = self._collect_unique_pairs()
+
+        # Translate to German
         english_sentences = [s["english"] for s in unique_sentences]
-        print(f"Translating {len(english_sentences)} sentences to German...")
+        logger.debug("Translating %d sentences to German", len(english_sentences))
         translated = self._translate_to_german(english_sentences)
-        print(f"German translations received: {len(translated)}")
+        logger.debug("German translations received: %d", len(translated))
         translated_dict = {t["english"]: t["german"] for t in translated}
-        print(f"Translation dictionary: {translated_dict}")
-
-        # Step 4: Add German translations to sentences and save to DB
-        complete_sentences = []
-        for s in unique_sentences:
-            english = s["english"]
-            german = translated_dict.get(english, "")
-            
-            # Add German to the sentence object
-            complete_sentence = {
+
+        return [
+            {
                 "hindi": s["hindi"],
-                "english": english,
-                "german": german
+                "english": s["english"],
+                "german": translated_dict.get(s["english"], "")
             }
-            complete_sentences.append(complete_sentence)
-            
-            # Save to database
-            DailySentence.objects.create(
-                hindi=s["hindi"],
-                english=english,
-                german=german,
-                hash=self._hash(english)
-            )
+            for s in unique_sentences
+        ]
+
+    def generate_daily(self, serve=True):
+        """
+        Main logic to generate and save new unique sentences.
+
+        With ``serve=False`` the sentences go to the inventory instead of today's set.
+        """
+        today = datetime.date.today()
+        
+        # Step 1: Bring the hash index up to date with rows stored since the last run
+        self.index.refresh()
 
-        return JsonResponse({
+        # Step 2: Generate translated sentences, chunked and concurrent for large counts
+        if self.pipeline:
+            complete_sentences = asyncio.run(self._generate_pipeline())
+        else:
+            complete_sentences = self._generate_sequential()
+
+        # Step 3: Save everything in one batch
+        complete_sentences = self._save(complete_sentences, today if serve else None)
+
+        return {
             "date": str(today),
             "sentences": complete_sentences,
             "status": "newly_generated",
-            "total_sentences_in_db": DailySentence.objects.count()
-        })
+            "total_sentences_in_db": len(self.index)
+        }
+
+    async def agenerate_daily(self, serve=True):
+        """
+        ``generate_daily`` for a running event loop: the model calls go through
+        the provider's async client and the ORM work runs in a worker thread.
+        """
+        today = datetime.date.today()
+        await sync_to_async(self.index.refresh)()
+        complete_sentences = await self._generate_pipeline()
+        complete_sentences = await sync_to_async(self._save)(complete_sentences, today if serve else None)
+
+        return {
+            "date": str(today),
+            "sentences": complete_sentences,
+            "status": "newly_generated",
+            "total_sentences_in_db": len(self.index)
+        }
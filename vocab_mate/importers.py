@@ -0,0 +1,189 @@
+"""
+Streaming vocabulary import from CSV or JSONL.
+
+Rows are read lazily, validated a batch at a time with ``WordImportSerializer``
+and written with one ``insert_many`` per batch, so memory stays flat however
+large the file is and 100k words cost a few hundred round trips instead of
+100k requests. ``Word.word`` is unique: rows whose word already exists are
+skipped or, with ``on_conflict='update'``, update the stored word.
+"""
+import csv
+import json
+import time
+
+from django.utils import timezone
+from pymongo import UpdateOne
+from rest_framework import serializers
+
+from .caching import bump_vocabulary_version
+from .models import Word
+from .mongo import allocate_ids, get_database, insert_new
+from .serializers import WordSerializer
+from .stats import invalidate_word_count
+
+FORMATS = ('csv', 'jsonl')
+ON_CONFLICT = ('skip', 'update')
+
+
+class WordImportSerializer(WordSerializer):
+    """``WordSerializer`` without the per-row uniqueness query; the importer checks a whole batch at once."""
+
+    class Meta(WordSerializer.Meta):
+        extra_kwargs = {'word': {'validators': []}}
+
+
+def detect_format(name):
+    return 'jsonl' if name.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, format):
+    """Yield ``(line_number, row)`` from a text stream; ``row`` is None when the line cannot be parsed."""
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Unknown import format: {format}")
+
+
+class ImportReport:
+    max_errors = 100
+
+    def __init__(self):
+        self.rows = self.created = self.updated = self.skipped = self.invalid = 0
+        self.errors = []  # the first ``max_errors`` invalid rows
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, line, errors):
+        self.invalid += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'invalid': self.invalid,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'errors': self.errors,
+        }
+
+
+class WordImporter:
+    batch_size = 1000
+
+    def __init__(self, on_conflict='skip', batch_size=None):
+        if on_conflict not in ON_CONFLICT:
+            raise ValueError(f"on_conflict must be one of {', '.join(ON_CONFLICT)}")
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size or self.batch_size
+        self.validator = WordImportSerializer()
+        # Model defaults for the fields a row may leave out
+        self.defaults = {
+            field.attname: field.get_default()
+            for field in Word._meta.concrete_fields
+            if not field.primary_key and field.has_default()
+        }
+
+    def run(self, stream, format='csv', progress=None):
+        """Import every row of ``stream``; ``progress(report)`` is called after each batch."""
+        report = ImportReport()
+        words = get_database()['words']
+        batch = []
+        try:
+            for line, row in read_rows(stream, format):
+                report.rows += 1
+                batch.append((line, row))
+                if len(batch) == self.batch_size:
+                    self._import_batch(words, batch, report)
+                    batch = []
+                    if progress:
+                        progress(report)
+            if batch:
+                self._import_batch(words, batch, report)
+        finally:
+            report.elapsed = time.perf_counter() - report.started
+            if report.created:
+                invalidate_word_count()
+            if report.created or report.updated:
+                bump_vocabulary_version()
+        return report
+
+    @staticmethod
+    def _clean(row):
+        # Empty CSV cells mean "use the default"; list columns may be JSON arrays or comma-separated
+        return {key: value for key, value in row.items() if value not in ('', None)}
+
+    def _validate(self, batch, report):
+        valid = {}
+        for line, row in batch:
+            if row is None:
+                report.add_error(line, {'non_field_errors': ['Not a valid row']})
+                continue
+            try:
+                data = self.validator.run_validation(self._clean(row))
+            except serializers.ValidationError as exc:
+                report.add_error(line, exc.detail)
+                continue
+            if data['word'] in valid:
+                report.skipped += 1  # repeated within the batch, the first one wins
+                continue
+            valid[data['word']] = data
+        return valid
+
+    def _import_batch(self, words, batch, report):
+        valid = self._validate(batch, report)
+        if not valid:
+            return
+        existing = {
+            doc['word'] for doc in words.find({'word': {'$in': list(valid)}}, {'_id': 0, 'word': 1})
+        }
+        now = timezone.now()
+
+        if existing:
+            if self.on_conflict == 'update':
+                result = words.bulk_write([
+                    UpdateOne({'word': word}, {'$set': {
+                        **valid[word], 'word_lower': word.casefold(), 'updated_at': now,
+                    }})
+                    for word in existing
+                ], ordered=False)
+                report.updated += result.matched_count
+            else:
+                report.skipped += len(existing)
+
+        new = [data for word, data in valid.items() if word not in existing]
+        if not new:
+            return
+        documents = [
+            {
+                **self.defaults,
+                **data,
+                'id': row_id,
+                'word_lower': data['word'].casefold(),
+                'created_at': now,
+                'updated_at': now,
+            }
+            for row_id, data in zip(allocate_ids('words', len(new)), new)
+        ]
+        # Words inserted by someone else since the check above are skipped
+        inserted = len(insert_new(words, documents))
+        report.created += inserted
+        report.skipped += len(documents) - inserted
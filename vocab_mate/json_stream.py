@@ -0,0 +1,76 @@
+"""
+Incremental parser for the JSON arrays the model returns.
+
+Model replies are a JSON array of objects, often wrapped in markdown fences or
+a sentence of chatter. ``JSONArrayStreamParser`` is fed the reply piece by piece
+(as streamed tokens or all at once) and hands back each object as soon as its
+closing brace arrives, so callers never wait for the whole array.
+"""
+import json
+
+
+class JSONArrayStreamParser:
+    def __init__(self):
+        self._started = False   # seen the opening '[' of the top-level array
+        self._finished = False  # seen its closing ']'
+        self._depth = 0         # nesting depth inside the current element
+        self._in_string = False
+        self._escaped = False
+        self._buffer = []
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def feed(self, text):
+        """Consume ``text`` and return the objects completed by it."""
+        objects = []
+        for char in text:
+            if self._finished:
+                break
+            if not self._started:
+                # Skip fences and chatter before the array
+                self._started = char == '['
+                continue
+
+            if self._depth == 0:
+                if char == '{':
+                    self._depth = 1
+                    self._buffer = [char]
+                elif char == ']':
+                    self._finished = True
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._decode(''.join(self._buffer))
+                    if obj is not None:
+                        objects.append(obj)
+                    self._buffer = []
+        return objects
+
+    @staticmethod
+    def _decode(raw):
+        try:
+            obj = json.loads(raw)
+        except ValueError:
+            return None  # a malformed element is dropped, the rest of the array still parses
+        return obj if isinstance(obj, dict) else None
+
+
+def parse_json_array(content):
+    """Return every object in the JSON array embedded in ``content``."""
+    return JSONArrayStreamParser().feed(content)
@@ -0,0 +1,293 @@
+"""
+LLM providers used by ``DailySentenceGenerator``.
+
+``settings.LLM_PROVIDER`` picks the provider returned by ``get_provider()``:
+
+- ``openai``: the real API (the default)
+- ``fake``: a deterministic local fake with configurable latency, output size
+  and malformed-reply rate, for load tests without an OpenAI account
+- ``replay``: replays replies recorded earlier to ``settings.LLM_REPLAY_PATH``
+
+Setting ``settings.LLM_RECORD_PATH`` wraps the provider so that every reply is
+appended to that JSONL file for later replay.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from itertools import count as counter
+
+from django.conf import settings
+
+
+class LLMProvider:
+    """A chat model that turns one prompt into one text reply."""
+
+    def complete(self, prompt, temperature):
+        raise NotImplementedError
+
+    def stream(self, prompt, temperature):
+        """Yield the reply in pieces as they are produced."""
+        yield self.complete(prompt, temperature)
+
+    async def acomplete(self, prompt, temperature):
+        raise NotImplementedError
+
+    async def aclose(self):
+        """Release resources held by ``acomplete`` on the running event loop."""
+
+
+class OpenAIProvider(LLMProvider):
+    model = "gpt-4o-mini"
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self):
+        # Created on first use so forked workers never share a connection pool
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    def _messages(self, prompt):
+        return [{"role": "user", "content": prompt}]
+
+    def complete(self, prompt, temperature):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt),
+            temperature=temperature
+        )
+        return response.choices[0].message.content.strip()
+
+    def stream(self, prompt, temperature):
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt),
+            temperature=temperature,
+            stream=True
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.response.close()
+
+    def _async_client_for_loop(self):
+        # An async client's connection pool belongs to one event loop, so each loop gets its own
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            from openai import AsyncOpenAI
+            client = self._async_clients[loop] = AsyncOpenAI(api_key=self.api_key)
+        return client
+
+    async def acomplete(self, prompt, temperature):
+        response = await self._async_client_for_loop().chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt),
+            temperature=temperature
+        )
+        return response.choices[0].message.content.strip()
+
+    async def aclose(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic stand-in for the model.
+
+    Replies to the generation prompts with the number of sentences asked for
+    (or ``output_size`` if set) and to translation prompts with one German
+    line per English sentence. ``malformed_rate`` of the replies are cut off
+    mid-array, which is what real truncated completions look like.
+    """
+
+    def __init__(self, latency=0.0, output_size=None, malformed_rate=0.0, seed=0, stream_pieces=20):
+        self.latency = latency
+        self.output_size = output_size
+        self.malformed_rate = malformed_rate
+        self.stream_pieces = stream_pieces
+        self._random = random.Random(seed)
+        self._serial = counter(1)
+        self._lock = threading.Lock()
+
+    def _reply(self, prompt):
+        with self._lock:
+            broken = self._random.random() < self.malformed_rate
+            translation = re.search(r'Sentences: (\[.*\])', prompt)
+            if translation:
+                english = json.loads(translation.group(1))
+                items = [{"english": e, "german": f"(de) {e}"} for e in english]
+            else:
+                asked = re.search(r'Generate (\d+)', prompt)
+                size = self.output_size or (int(asked.group(1)) if asked else 20)
+                with_german = '"german"' in prompt
+                items = []
+                for _ in range(size):
+                    n = next(self._serial)
+                    item = {"hindi": f"अभ्यास वाक्य {n}", "english": f"Practice sentence number {n}."}
+                    if with_german:
+                        item["german"] = f"Übungssatz Nummer {n}."
+                    items.append(item)
+
+        reply = json.dumps(items, ensure_ascii=False)
+        return reply[:len(reply) // 2] if broken else reply
+
+    def complete(self, prompt, temperature):
+        time.sleep(self.latency)
+        return self._reply(prompt)
+
+    def stream(self, prompt, temperature):
+        reply = self._reply(prompt)
+        size = max(len(reply) // self.stream_pieces, 1)
+        for start in range(0, len(reply), size):
+            time.sleep(self.latency / self.stream_pieces)
+            yield reply[start:start + size]
+
+    async def acomplete(self, prompt, temperature):
+        await asyncio.sleep(self.latency)
+        return self._reply(prompt)
+
+
+def _prompt_key(prompt, temperature):
+    normalized = ' '.join(prompt.split())
+    return hashlib.sha256(f"{temperature}:{normalized}".encode()).hexdigest()
+
+
+class RecordingProvider(LLMProvider):
+    """Pass calls through to ``inner`` and append each reply to a JSONL file."""
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _record(self, prompt, temperature, reply):
+        line = json.dumps({
+            "key": _prompt_key(prompt, temperature),
+            "temperature": temperature,
+            "prompt": prompt,
+            "reply": reply,
+        }, ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def complete(self, prompt, temperature):
+        reply = self.inner.complete(prompt, temperature)
+        self._record(prompt, temperature, reply)
+        return reply
+
+    def stream(self, prompt, temperature):
+        pieces = []
+        try:
+            for piece in self.inner.stream(prompt, temperature):
+                pieces.append(piece)
+                yield piece
+        finally:
+            self._record(prompt, temperature, ''.join(pieces))
+
+    async def acomplete(self, prompt, temperature):
+        reply = await self.inner.acomplete(prompt, temperature)
+        self._record(prompt, temperature, reply)
+        return reply
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Answer from replies recorded by ``RecordingProvider``.
+
+    A prompt recorded verbatim gets its own reply back. Generation prompts
+    quote a random sample of earlier sentences and rarely repeat exactly, so
+    anything else gets the recorded replies of the same kind in turn.
+    """
+
+    def __init__(self, path):
+        self._by_key = {}
+        self._by_kind = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._by_key[entry["key"]] = entry["reply"]
+                self._by_kind.setdefault(self._kind(entry["prompt"]), []).append(entry["reply"])
+        self._turns = {kind: counter() for kind in self._by_kind}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _kind(prompt):
+        if 'Sentences: ' in prompt:
+            return 'translation'
+        return 'triples' if '"german"' in prompt else 'pairs'
+
+    def complete(self, prompt, temperature):
+        reply = self._by_key.get(_prompt_key(prompt, temperature))
+        if reply is not None:
+            return reply
+        kind = self._kind(prompt)
+        if kind not in self._by_kind:
+            raise LookupError(f"No recorded {kind} replies to replay")
+        with self._lock:
+            replies = self._by_kind[kind]
+            return replies[next(self._turns[kind]) % len(replies)]
+
+    async def acomplete(self, prompt, temperature):
+        return self.complete(prompt, temperature)
+
+
+def build_provider(name=None):
+    name = name or getattr(settings, 'LLM_PROVIDER', 'openai')
+    if name == 'openai':
+        provider = OpenAIProvider()
+    elif name == 'fake':
+        provider = FakeProvider(
+            latency=getattr(settings, 'LLM_FAKE_LATENCY', 0.0),
+            output_size=getattr(settings, 'LLM_FAKE_OUTPUT_SIZE', None),
+            malformed_rate=getattr(settings, 'LLM_FAKE_MALFORMED_RATE', 0.0),
+        )
+    elif name == 'replay':
+        provider = ReplayProvider(settings.LLM_REPLAY_PATH)
+    else:
+        raise ValueError(f"Unknown LLM provider: {name}")
+
+    record_path = getattr(settings, 'LLM_RECORD_PATH', '')
+    if record_path:
+        provider = RecordingProvider(provider, record_path)
+    return provider
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """The process-wide provider configured in settings, built on first use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = build_provider()
+        return _provider
+
+
+def reset_provider():
+    """Forget the shared provider, e.g. after forking, so each process builds its own."""
+    global _provider
+    with _provider_lock:
+        _provider = None
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from pymongo import UpdateOne
+
+from vocab_mate.daily_sentences import DailySentenceStore
+from vocab_mate.generate_sentence import DailySentenceGenerator
+from vocab_mate.models import DailySentence
+from vocab_mate.mongo import get_database
+
+
+class Command(BaseCommand):
+    help = "Translate daily sentences whose German translation is missing, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Sentences per translation request')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        generator = DailySentenceGenerator()
+        store = DailySentenceStore()
+        sentences = get_database()[DailySentence._meta.db_table]
+        missing = DailySentence.objects.filter(Q(german='') | Q(german__isnull=True)).order_by('id')
+
+        last_id = 0
+        updated = still_missing = 0
+        while True:
+            batch = list(missing.filter(id__gt=last_id).values_list('id', 'english', 'served_on')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            translated = {
+                t["english"]: t["german"]
+                for t in generator._translate_to_german([english for _, english, _ in batch])
+            }
+            dates = set()
+            updates = []
+            for row_id, english, served_on in batch:
+                german = translated.get(english)
+                if not german:
+                    still_missing += 1
+                    continue
+                updates.append(UpdateOne({'id': row_id}, {'$set': {'german': german}}))
+                if served_on:
+                    dates.add(served_on)
+                updated += 1
+            if updates:
+                sentences.bulk_write(updates, ordered=False)
+            for date in dates:
+                store.forget(date)
+
+            self.stdout.write(f"Translated {updated} sentences so far...")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} sentences, {still_missing} still missing German."))
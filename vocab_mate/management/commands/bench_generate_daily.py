@@ -0,0 +1,99 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from pymongo import monitoring
+
+from vocab_mate.generate_sentence import DailySentenceGenerator, sentence_hash
+from vocab_mate.llm import FakeProvider, ReplayProvider
+from vocab_mate.models import DailySentence, TranslationMemo
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts every command sent to MongoDB, whether it came through djongo or pymongo."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark DailySentenceGenerator.generate_daily end to end against an offline LLM provider: "
+        "latency, MongoDB round trips and throughput under concurrent callers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--provider', choices=['fake', 'replay'], default='fake')
+        parser.add_argument('--replay-path', help='JSONL file recorded with LLM_RECORD_PATH')
+        parser.add_argument('--latency', type=float, default=0.2, help='Fake provider seconds per call')
+        parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fake provider share of broken replies')
+        parser.add_argument('--count', type=int, default=20, help='Sentences per generation')
+        parser.add_argument('--pipeline', action='store_true', help='Force the chunked concurrent pipeline')
+        parser.add_argument('--iterations', type=int, default=10, help='Generations in total')
+        parser.add_argument('--concurrency', type=int, default=1, help='Concurrent callers')
+        parser.add_argument('--max-p95', type=float, help='Fail when p95 latency (seconds) is above this')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows instead of deleting them')
+
+    def handle(self, *args, **options):
+        if options['provider'] == 'replay':
+            if not options['replay_path']:
+                raise CommandError("--replay-path is required with --provider replay")
+            provider = ReplayProvider(options['replay_path'])
+        else:
+            provider = FakeProvider(latency=options['latency'], malformed_rate=options['malformed_rate'])
+
+        # Registered before any connection is opened so every client reports to it
+        round_trips = RoundTripCounter()
+        monitoring.register(round_trips)
+
+        def run_once(_):
+            generator = DailySentenceGenerator(
+                count=options['count'], provider=provider, pipeline=options['pipeline'] or None
+            )
+            started = time.perf_counter()
+            try:
+                result = generator.generate_daily(serve=False)
+            finally:
+                connection.close()
+            return time.perf_counter() - started, result["sentences"]
+
+        round_trips_before = round_trips.count
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            runs = list(pool.map(run_once, range(options['iterations'])))
+        wall = time.perf_counter() - started
+        total_round_trips = round_trips.count - round_trips_before
+
+        latencies = sorted(latency for latency, _ in runs)
+        sentences = [s for _, batch in runs for s in batch]
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+
+        self.stdout.write(f"generations:      {len(runs)} ({options['concurrency']} concurrent)")
+        self.stdout.write(f"latency p50:      {statistics.median(latencies) * 1000:.1f} ms")
+        self.stdout.write(f"latency p95:      {p95 * 1000:.1f} ms")
+        self.stdout.write(f"latency max:      {latencies[-1] * 1000:.1f} ms")
+        self.stdout.write(f"db round trips:   {total_round_trips / len(runs):.1f} per generation")
+        self.stdout.write(f"throughput:       {len(runs) / wall:.2f} generations/s, {len(sentences) / wall:.1f} sentences/s")
+        self.stdout.write(f"sentences stored: {len(sentences)} of {options['count'] * len(runs)} requested")
+
+        if not options['keep']:
+            hashes = [sentence_hash(s["english"]) for s in sentences]
+            DailySentence.objects.filter(hash__in=hashes).delete()
+            TranslationMemo.objects.filter(hash__in=hashes).delete()
+
+        if options['max_p95'] is not None and p95 > options['max_p95']:
+            raise CommandError(f"p95 latency {p95:.3f}s is above the {options['max_p95']:.3f}s budget")
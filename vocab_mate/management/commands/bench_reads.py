@@ -0,0 +1,73 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from vocab_mate.models import Word
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare latency of the hot read endpoints served through the ORM and through the "
+        "repository read path (settings.FAST_READ_PATH), in process against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='User to request as (default: the first user)')
+        parser.add_argument('--iterations', type=int, default=200, help='Requests per endpoint and path')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests first')
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        user = users.filter(username=options['username']).first() if options['username'] else users.first()
+        if user is None:
+            raise CommandError("No user to request as; create one first.")
+        word_id = Word.objects.values_list('id', flat=True).first()
+        if word_id is None:
+            raise CommandError("No words to read; import some first.")
+
+        page = f"?page_size={options['page_size']}"
+        endpoints = [
+            ('word list', f'/api/words/{page}'),
+            ('word detail', f'/api/words/{word_id}/'),
+            ('progress list', f'/api/progress/{page}'),
+            ('stats', '/api/stats/'),
+        ]
+
+        # A request through the whole stack, connection setup and teardown included
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user)
+
+        self.stdout.write(f"{'endpoint':<15}{'orm p50':>10}{'orm p95':>10}{'repo p50':>10}{'repo p95':>10}{'speedup':>9}")
+        for name, url in endpoints:
+            results = {}
+            for fast in (False, True):
+                # ALLOWED_HOSTS may only list the production domain
+                with override_settings(FAST_READ_PATH=fast, ALLOWED_HOSTS=['localhost']):
+                    results[fast] = self._measure(client, url, options['warmup'], options['iterations'])
+            (orm_p50, orm_p95), (repo_p50, repo_p95) = results[False], results[True]
+            self.stdout.write(
+                f"{name:<15}{orm_p50:>8.2f}ms{orm_p95:>8.2f}ms{repo_p50:>8.2f}ms{repo_p95:>8.2f}ms"
+                f"{orm_p50 / repo_p50 if repo_p50 else 0:>8.1f}x"
+            )
+
+    def _measure(self, client, url, warmup, iterations):
+        for _ in range(warmup):
+            self._get(client, url)
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            self._get(client, url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        return statistics.median(latencies), latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+
+    @staticmethod
+    def _get(client, url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"GET {url} returned {response.status_code}")
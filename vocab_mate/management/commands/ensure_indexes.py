@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from vocab_mate.caching import bump_vocabulary_version
+from vocab_mate.daily_sentences import ensure_lock_indexes
+from vocab_mate.exporters import ensure_export_indexes
+from vocab_mate.mongo import get_database
+from vocab_mate.progress import backfill_review_schedule
+from vocab_mate.search import backfill_word_lower, convert_word_lists, ensure_search_indexes
+
+
+class Command(BaseCommand):
+    help = "Create the MongoDB indexes the ORM does not manage and backfill their fields (safe on every deploy)."
+
+    def handle(self, *args, **options):
+        db = get_database()
+        ensure_search_indexes(db)
+        ensure_export_indexes(db)
+        ensure_lock_indexes(db)
+        backfilled = backfill_word_lower(db)
+        if backfilled:
+            self.stdout.write(f"Filled word_lower on {backfilled} words.")
+        converted = convert_word_lists(db)
+        if converted:
+            bump_vocabulary_version()
+            self.stdout.write(f"Converted tags/synonyms/antonyms to arrays on {converted} words.")
+        scheduled = backfill_review_schedule(db)
+        if scheduled:
+            self.stdout.write(f"Scheduled {scheduled} never-reviewed cards for review.")
+        self.stdout.write(self.style.SUCCESS("Indexes are in place."))
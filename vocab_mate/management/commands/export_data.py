@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from vocab_mate.exporters import BATCH_SIZE, EXPORTS, export_lines, gzip_chunks
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the words or user progress collection as NDJSON (optionally gzip) to a file or stdout. "
+        "--since exports only what changed at or after a point in time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS), help='What to export')
+        parser.add_argument('--output', '-o', default='-', help="Output file, '-' for stdout")
+        parser.add_argument('--since', help='ISO datetime, e.g. 2024-05-01T00:00:00Z')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Documents per cursor batch')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Not an ISO datetime: {options['since']}")
+
+        chunks = export_lines(options['name'], since=since, batch_size=options['batch_size'])
+        if options['gzip']:
+            chunks = gzip_chunks(chunks)
+
+        if options['output'] == '-':
+            output = sys.stdout.buffer
+            for chunk in chunks:
+                output.write(chunk)
+            output.flush()
+            return
+
+        written = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vocab_mate.daily_sentences import DailySentenceStore, DailySentencesUnavailable
+
+
+class Command(BaseCommand):
+    help = "Generate today's daily sentence set ahead of the first request (run from a scheduler)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help='Number of sentences in the set')
+
+    def handle(self, *args, **options):
+        try:
+            payload = DailySentenceStore(count=options['count']).get_or_generate()
+        except DailySentencesUnavailable as ex:
+            raise CommandError(str(ex))
+
+        if not payload["sentences"]:
+            raise CommandError(f"No sentences were generated for {payload['date']}.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{payload['date']}: {len(payload['sentences'])} sentences ({payload['status']})"
+        ))
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vocab_mate.importers import FORMATS, ON_CONFLICT, WordImporter, detect_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Import words from a CSV (with a header row) or JSONL file in validated batches and bulk inserts. "
+        "Use '-' to read from stdin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, or '-' for stdin")
+        parser.add_argument('--format', choices=FORMATS, help='Input format (default: from the file extension)')
+        parser.add_argument('--on-conflict', choices=ON_CONFLICT, default='skip',
+                            help='What to do with words that already exist')
+        parser.add_argument('--batch-size', type=int, default=WordImporter.batch_size, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('csv' if path == '-' else detect_format(path))
+        importer = WordImporter(on_conflict=options['on_conflict'], batch_size=options['batch_size'])
+
+        def progress(report):
+            self.stdout.write(f"{report.rows} rows read, {report.created} created", ending='\r')
+
+        try:
+            if path == '-':
+                report = importer.run(sys.stdin, format, progress)
+            else:
+                with open(path, newline='', encoding='utf-8-sig') as stream:
+                    report = importer.run(stream, format, progress)
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report.rows} rows in {report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/s): "
+            f"{report.created} created, {report.updated} updated, {report.skipped} skipped, "
+            f"{report.invalid} invalid."
+        ))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vocab_mate.daily_sentences import DailySentenceStore
+from vocab_mate.generate_sentence import DailySentenceGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the inventory of pre-generated daily sentences so requests never wait on the LLM. "
+        "Exits with an error when the inventory is below the low watermark, so cron can alert or top up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Days of sentences to keep in stock')
+        parser.add_argument('--per-day', type=int, default=20, help='Sentences served per day')
+        parser.add_argument('--low-watermark', type=int, default=7,
+                            help='Days of stock below which the inventory is reported as low')
+        parser.add_argument('--batch-size', type=int, default=100, help='Sentences generated per run')
+        parser.add_argument('--check', action='store_true', help='Only report the inventory status')
+
+    def handle(self, *args, **options):
+        per_day = options['per_day']
+        store = DailySentenceStore(count=per_day)
+        available = store.inventory_size()
+
+        if not options['check']:
+            target = options['days'] * per_day
+            while available < target:
+                count = min(options['batch_size'], target - available)
+                result = DailySentenceGenerator(count=count).generate_daily(serve=False)
+                generated = len(result["sentences"])
+                if not generated:
+                    self.stderr.write("Generation returned no new sentences, stopping.")
+                    break
+                available += generated
+                self.stdout.write(f"Generated {generated} sentences, {available}/{target} in stock")
+
+        days_left = available // per_day if per_day else 0
+        if days_left < options['low_watermark']:
+            raise CommandError(
+                f"Inventory low: {available} sentences ({days_left} days), "
+                f"watermark is {options['low_watermark']} days."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Inventory ok: {available} sentences ({days_left} days)."))
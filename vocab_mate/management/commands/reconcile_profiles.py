@@ -0,0 +1,72 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from vocab_mate.models import UserProfile
+from vocab_mate.mongo import get_database
+from vocab_mate.profiles import streaks
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the UserProfile counters (words learned/in progress, streaks) from user_progress "
+        "for every user in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Profile updates per bulk write')
+
+    def handle(self, *args, **options):
+        with_profile = set(UserProfile.objects.values_list('user_id', flat=True))
+        missing = [
+            UserProfile(user_id=user_id)
+            for user_id in User.objects.values_list('id', flat=True) if user_id not in with_profile
+        ]
+        if missing:
+            UserProfile.objects.bulk_create(missing)
+            self.stdout.write(f"Created {len(missing)} missing profiles.")
+
+        db = get_database()
+        today = datetime.date.today()
+        reviewed_day = {'$dateToString': {'format': '%Y-%m-%d', 'date': '$last_reviewed'}}
+        groups = db['user_progress'].aggregate([
+            {'$group': {
+                '_id': '$user_id',
+                'learned': {'$sum': {'$cond': ['$is_learned', 1, 0]}},
+                'in_progress': {'$sum': {'$cond': ['$is_learned', 0, 1]}},
+                'days': {'$addToSet': {'$cond': [{'$gt': ['$times_reviewed', 0]}, reviewed_day, None]}},
+            }},
+        ], allowDiskUse=True)
+
+        profiles = db['user_profiles']
+        seen = []
+        batch = []
+        for group in groups:
+            # Only the latest review of each word is stored, so history can only
+            # lengthen the recorded longest streak, never shorten it
+            days = {datetime.date.fromisoformat(day) for day in group['days'] if day}
+            current, longest = streaks(days, today)
+            batch.append(UpdateOne({'user_id': group['_id']}, {
+                '$set': {
+                    'total_words_learned': group['learned'],
+                    'words_in_progress': group['in_progress'],
+                    'current_streak': current,
+                    'last_review_date': datetime.datetime.combine(max(days), datetime.time.min) if days else None,
+                },
+                '$max': {'longest_streak': longest},
+            }))
+            seen.append(group['_id'])
+            if len(batch) == options['batch_size']:
+                profiles.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            profiles.bulk_write(batch, ordered=False)
+
+        profiles.update_many({'user_id': {'$nin': seen}}, {'$set': {
+            'total_words_learned': 0,
+            'words_in_progress': 0,
+            'current_streak': 0,
+        }})
+        self.stdout.write(self.style.SUCCESS(f"Reconciled profiles for {len(seen)} users with progress."))
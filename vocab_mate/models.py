@@ -1,10 +1,66 @@
+from django import forms
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 from djongo import models as djongo_models
 
 
+def split_string_list(value):
+    """``'food, drink'`` → ``['food', 'drink']``: trimmed, without blanks or repeats."""
+    return list(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+
+
+class StringListFormField(forms.CharField):
+    """A comma-separated text input for a ``StringListField``."""
+
+    def prepare_value(self, value):
+        if isinstance(value, (list, tuple)):
+            return ', '.join(value)
+        return value
+
+    def to_python(self, value):
+        return split_string_list(super().to_python(value))
+
+
+class StringListField(djongo_models.JSONField):
+    """
+    A list of strings stored as a MongoDB array.
+
+    Filtering on a single string, ``filter(tags='food')``, becomes
+    ``{'tags': 'food'}``, which matches documents whose array contains it.
+    A string assigned to the field is split on commas, so only lists are stored.
+    """
+
+    def to_python(self, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return split_string_list(value)
+        if isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+            return list(value)
+        raise ValidationError('Enter a list of strings.', code='invalid')
+
+    def from_db_value(self, value, expression, connection):
+        # Comma-separated strings left by older versions, see ``convert_word_lists``
+        return split_string_list(value) if isinstance(value, str) else value
+
+    def get_prep_value(self, value):
+        # Lookups pass the single string to match; saves go through get_db_prep_save
+        if isinstance(value, str):
+            return value
+        return super().get_prep_value(value)
+
+    def get_db_prep_save(self, value, connection):
+        return super().get_db_prep_save(self.to_python(value), connection)
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{'form_class': StringListFormField, **kwargs})
+
+
 class Word(djongo_models.Model):
     word = djongo_models.CharField(max_length=100, unique=True)
+    # Case-folded copy of ``word`` for prefix lookups; indexed by ``manage.py ensure_indexes``
+    word_lower = djongo_models.CharField(max_length=100, editable=False, default='')
     definition = djongo_models.TextField()
     pronunciation = djongo_models.CharField(max_length=100, blank=True)
     example_sentence = djongo_models.TextField(blank=True)
@@ -17,15 +73,20 @@ class Word(djongo_models.Model):
         ],
         default='beginner'
     )
-    tags = djongo_models.TextField(blank=True, default='')  # Store as comma-separated string
-    synonyms = djongo_models.TextField(blank=True, default='')  # Store as comma-separated string
-    antonyms = djongo_models.TextField(blank=True, default='')  # Store as comma-separated string
+    # Native arrays; ``tags`` has a multikey index, see ``manage.py ensure_indexes``
+    tags = StringListField(blank=True, default=list)
+    synonyms = StringListField(blank=True, default=list)
+    antonyms = StringListField(blank=True, default=list)
     created_at = djongo_models.DateTimeField(auto_now_add=True)
     updated_at = djongo_models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.word
 
+    def save(self, *args, **kwargs):
+        self.word_lower = self.word.casefold()
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['word']
         db_table = 'words'
@@ -42,6 +103,18 @@ class UserProgress(djongo_models.Model):
     learning_streak = djongo_models.PositiveIntegerField(default=0)
     mastery_score = djongo_models.FloatField(default=0.0)  # 0.0 to 1.0
     review_schedule = djongo_models.DateTimeField(null=True, blank=True)
+    # SM-2 state, see ``vocab_mate.scheduling``
+    ease_factor = djongo_models.FloatField(default=2.5)
+    interval_days = djongo_models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so the signals can tell what a save changed
+        loaded = dict(zip(field_names, values))
+        instance._loaded_is_learned = loaded.get('is_learned')
+        instance._loaded_times_reviewed = loaded.get('times_reviewed')
+        return instance
 
     class Meta:
         ordering = ['-last_reviewed']
@@ -49,15 +122,18 @@ class UserProgress(djongo_models.Model):
         indexes = [
             djongo_models.Index(fields=['user_id', 'word_id']),
             djongo_models.Index(fields=['user_id', 'is_learned']),
-            djongo_models.Index(fields=['review_schedule']),
+            djongo_models.Index(fields=['user_id', 'review_schedule']),
         ]
 
 
 class UserProfile(djongo_models.Model):
     user_id = djongo_models.IntegerField(unique=True)  # Reference to Django User ID
+    # Counters kept current by ``vocab_mate.profiles``; ``reconcile_profiles`` rebuilds them
     total_words_learned = djongo_models.PositiveIntegerField(default=0)
+    words_in_progress = djongo_models.PositiveIntegerField(default=0)
     current_streak = djongo_models.PositiveIntegerField(default=0)
     longest_streak = djongo_models.PositiveIntegerField(default=0)
+    last_review_date = djongo_models.DateField(null=True, blank=True)
     preferred_difficulty = djongo_models.CharField(
         max_length=20,
         choices=[
@@ -81,6 +157,20 @@ class DailySentence(models.Model):
     english = models.TextField()
     german = models.TextField(blank=True, null=True)
     hash = models.CharField(max_length=128, unique=True)
+    # Pre-generated sentences wait in the inventory (served_on is null) until a day claims them
+    prefilled = models.BooleanField(default=False)
+    served_on = models.DateField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"{self.hindi} → {self.english} → {self.german}"
+
+
+class TranslationMemo(models.Model):
+    """English→German translations keyed by the same sha256 as ``DailySentence.hash``."""
+    hash = models.CharField(max_length=128, unique=True)
+    english = models.TextField()
+    german = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.english} → {self.german}"
@@ -0,0 +1,112 @@
+"""
+Direct access to the MongoDB database behind djongo.
+
+For queries the ORM cannot express (text search, aggregations, bulk writes)
+we talk to the same collections through the pymongo database that djongo
+already holds for this thread.
+
+Hot read paths use ``shared_database()`` instead: one pooled ``MongoClient``
+per process, built from the same settings, which survives across requests
+where djongo's connection is reopened with every one. Async views use
+``async_database()``, the same through motor.
+"""
+import asyncio
+import threading
+import weakref
+
+from django.conf import settings
+from django.db import connection
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_database():
+    """The pymongo ``Database`` of the default connection."""
+    connection.ensure_connection()
+    return connection.connection
+
+
+def _client_options():
+    # The options djongo connects with; aware UTC datetimes, like the ORM hands out with USE_TZ
+    return {'tz_aware': True, **settings.DATABASES['default']['CLIENT']}
+
+
+def get_client():
+    """The process-wide pooled client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MongoClient(connect=False, **_client_options())
+        return _client
+
+
+def shared_database():
+    """The default database through the shared client."""
+    return get_client()[settings.DATABASES['default']['NAME']]
+
+
+def async_database():
+    """The default database through a motor client of the running event loop."""
+    # A motor client belongs to the loop it was created on, so each loop gets its own
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = _async_clients[loop] = AsyncIOMotorClient(io_loop=loop, **_client_options())
+    return client[settings.DATABASES['default']['NAME']]
+
+
+def reset_client():
+    """Drop the shared clients, e.g. after forking: a client must not be shared across processes."""
+    global _client
+    with _client_lock:
+        _client = None
+    _async_clients.clear()
+
+
+def allocate_ids(collection, count):
+    """
+    Reserve ``count`` consecutive values of a collection's auto-increment ``id``.
+
+    Rows inserted through pymongo need the integer ``id`` the ORM uses as primary
+    key; djongo keeps its counter in the ``__schema__`` collection, so we take
+    ours from the same counter and never collide with ORM inserts.
+    """
+    if count <= 0:
+        return []
+    schema = get_database()['__schema__'].find_one_and_update(
+        {'name': collection},
+        {'$inc': {'auto.seq': count}, '$setOnInsert': {'auto.field_names': ['id']}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    last = schema['auto']['seq']
+    return list(range(last - count + 1, last + 1))
+
+
+def insert_new(collection, documents):
+    """
+    Insert ``documents`` with one unordered ``insert_many``, skipping the ones
+    that hit a unique index (someone else inserted them first).
+
+    djongo reports duplicate keys as a plain ``DatabaseError``, so this is the
+    only way to tell them apart from real failures, which are raised.
+    Returns the documents that went in.
+    """
+    if not documents:
+        return []
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as exc:
+        errors = exc.details['writeErrors']
+        if any(error['code'] != DUPLICATE_KEY for error in errors):
+            raise
+        skipped = {error['index'] for error in errors}
+        return [document for index, document in enumerate(documents) if index not in skipped]
+    return documents
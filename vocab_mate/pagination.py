@@ -0,0 +1,265 @@
+"""
+Keyset (cursor) pagination.
+
+``PageNumberPagination`` costs a ``count()`` plus a skip/limit query per page,
+and both get slower the deeper the page on MongoDB. Here each page is fetched
+with a range query that starts right after the last row of the previous page,
+using the list's ordering plus the primary key as a tiebreaker, so every page
+costs the same. The total is only counted when the client asks with
+``?count=true``. The same cursors page through raw documents on the
+repository read path.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+from pymongo import ASCENDING, DESCENDING
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    # Default ordering; the model's primary key is appended as the tiebreaker when it is missing
+    ordering = ()
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, request, view, model):
+        """The view's ``?ordering=`` field when it is allowed, else the default, plus the tiebreaker."""
+        ordering = list(self.ordering)
+        requested = request.query_params.get('ordering', '').split(',')[0].strip()
+        if requested and requested.lstrip('-') in (getattr(view, 'ordering_fields', None) or []):
+            ordering = [requested]
+        tiebreaker = model._meta.pk.attname
+        if not ordering:
+            ordering.append('-' + tiebreaker)
+        elif ordering[-1].lstrip('-') != tiebreaker:
+            ordering.append(('-' if ordering[-1].startswith('-') else '') + tiebreaker)
+        return ordering
+
+    def encode_cursor(self, payload):
+        raw = json.dumps(payload, default=self._encode_value, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return str(value)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _wants_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def _start(self, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.next_link = self.previous_link = None
+        self.count = None
+        # Set by ``WordSearchFilter`` when ``?search=`` matched more words than it keeps
+        self.truncated = getattr(request, 'search_truncated', False)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self._start(request)
+
+        if isinstance(queryset, list):
+            # Already ranked (search results): page through the list by position
+            return self._paginate_list(queryset, request)
+
+        if self._wants_count(request):
+            self.count = queryset.count()
+
+        ordering = self.get_ordering(request, view, queryset.model)
+        cursor = self.decode_cursor(request) or {}
+        reverse = bool(cursor.get('r'))
+        if 'v' in cursor:
+            queryset = queryset.filter(self._beyond(queryset.model, ordering, cursor['v'], reverse))
+
+        order_by = [self._flip(field) for field in ordering] if reverse else ordering
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        return self._page(rows, ordering, cursor, reverse)
+
+    def paginate_documents(self, repository, query, request, view=None):
+        """
+        Like ``paginate_queryset``, for raw documents read through a repository
+        (see ``vocab_mate.repositories``). Cursors are interchangeable between the two.
+        """
+        self._start(request)
+        if self._wants_count(request):
+            self.count = repository.count(query)
+
+        page_query, sort, ordering, cursor, reverse = self._document_query(repository.model, query, request, view)
+        rows = repository.find(page_query, sort, self.page_size + 1)
+        return self._page(rows, ordering, cursor, reverse)
+
+    async def apaginate_documents(self, repository, query, request, view=None):
+        """``paginate_documents`` through the repository's async driver."""
+        self._start(request)
+        if self._wants_count(request):
+            self.count = await repository.acount(query)
+
+        page_query, sort, ordering, cursor, reverse = self._document_query(repository.model, query, request, view)
+        rows = await repository.afind(page_query, sort, self.page_size + 1)
+        return self._page(rows, ordering, cursor, reverse)
+
+    def _document_query(self, model, query, request, view):
+        ordering = self.get_ordering(request, view, model)
+        cursor = self.decode_cursor(request) or {}
+        reverse = bool(cursor.get('r'))
+        if 'v' in cursor:
+            query = {'$and': [query, self._beyond_document(model, ordering, cursor['v'], reverse)]}
+        sort = [
+            (field.lstrip('-'), DESCENDING if field.startswith('-') != reverse else ASCENDING)
+            for field in ordering
+        ]
+        return query, sort, ordering, cursor, reverse
+
+    def _page(self, rows, ordering, cursor, reverse):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if rows:
+            first, last = self._position(rows[0], ordering), self._position(rows[-1], ordering)
+            if reverse:
+                # Walking backwards: there is always a page after, and one before if we over-fetched
+                self.next_link = self.encode_cursor({'v': last})
+                if has_more:
+                    self.previous_link = self.encode_cursor({'v': first, 'r': 1})
+            else:
+                if has_more:
+                    self.next_link = self.encode_cursor({'v': last})
+                if 'v' in cursor:
+                    self.previous_link = self.encode_cursor({'v': first, 'r': 1})
+        return rows
+
+    def _paginate_list(self, items, request):
+        cursor = self.decode_cursor(request) or {}
+        try:
+            offset = max(int(cursor.get('o', 0)), 0)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if self._wants_count(request):
+            self.count = len(items)
+        if offset + self.page_size < len(items):
+            self.next_link = self.encode_cursor({'o': offset + self.page_size})
+        if offset > 0:
+            self.previous_link = self.encode_cursor({'o': max(offset - self.page_size, 0)})
+        return items[offset:offset + self.page_size]
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _position(obj, ordering):
+        if isinstance(obj, dict):
+            return [obj[field.lstrip('-')] for field in ordering]
+        return [getattr(obj, field.lstrip('-')) for field in ordering]
+
+    def _cursor_values(self, model, ordering, values):
+        if len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _beyond(self, model, ordering, values, reverse):
+        """
+        Rows strictly after ``values`` in ``ordering`` (before them when ``reverse``):
+        ``a > va OR (a = va AND b > vb) OR ...``
+        """
+        values = self._cursor_values(model, ordering, values)
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            for previous, value in zip(ordering[:i], values[:i]):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def _beyond_document(self, model, ordering, values, reverse):
+        """``_beyond`` as a MongoDB filter."""
+        values = self._cursor_values(model, ordering, values)
+        branches = []
+        for i, field in enumerate(ordering):
+            descending = field.startswith('-') != reverse
+            step = {previous.lstrip('-'): value for previous, value in zip(ordering[:i], values[:i])}
+            step[field.lstrip('-')] = {'$lt' if descending else '$gt': values[i]}
+            branches.append(step)
+        return {'$or': branches}
+
+    def get_paginated_data(self, data):
+        body = {'next': self.next_link, 'previous': self.previous_link}
+        if self.count is not None:
+            body['count'] = self.count
+        if self.truncated:
+            body['truncated'] = True
+        body['results'] = data
+        return body
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer', 'description': 'Only with ?count=true'},
+                'truncated': {'type': 'boolean',
+                              'description': 'Only when ?search= matched more words than it returns'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Cursor from a previous `next`/`previous` link', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': f'Results per page (max {self.max_page_size})', 'schema': {'type': 'integer'}},
+            {'name': self.count_query_param, 'required': False, 'in': 'query',
+             'description': 'Include the total count (costs a count query)', 'schema': {'type': 'boolean'}},
+        ]
+
+
+class WordPagination(KeysetPagination):
+    ordering = ('word', 'id')
+
+
+class UserProgressPagination(KeysetPagination):
+    ordering = ('-last_reviewed', '-word_id')
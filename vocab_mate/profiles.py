@@ -0,0 +1,96 @@
+"""
+Incremental maintenance of the ``UserProfile`` counters.
+
+Every change is a single atomic ``$inc``/``$set``/``$max`` on the profile
+document, so concurrent requests never lose an update and reading a user's
+totals is one document fetch. ``reconcile_profiles`` rebuilds the counters
+from ``user_progress`` should they ever drift.
+"""
+import datetime
+
+from django.core.cache import cache
+from pymongo import ReturnDocument
+
+from .mongo import get_database
+
+REVIEW_DAY_KEY = 'profiles:review-day:{user_id}'
+
+
+def _day_start(day):
+    # Dates are stored as midnight datetimes, the way djongo stores DateField values
+    return datetime.datetime.combine(day, datetime.time.min)
+
+
+def apply_progress_change(user_id, learned=0, in_progress=0, reviewed_on=None):
+    """Shift the learned/in-progress counters and count ``reviewed_on`` towards the streak."""
+    profiles = get_database()['user_profiles']
+    inc = {field: delta for field, delta in (
+        ('total_words_learned', learned),
+        ('words_in_progress', in_progress),
+    ) if delta}
+    if inc:
+        profiles.update_one({'user_id': user_id}, {'$inc': inc})
+    if reviewed_on is not None:
+        record_review_day(user_id, reviewed_on, profiles)
+
+
+def record_review_day(user_id, day, profiles=None):
+    """
+    Extend the streak when ``day`` follows the last review day, restart it
+    when it comes later than that, and ignore it when it comes earlier (an
+    offline session synced late, a skewed client clock).
+
+    Only the first review of a day touches the database; later ones are
+    skipped through the cache.
+    """
+    key = REVIEW_DAY_KEY.format(user_id=user_id)
+    if cache.get(key) == day.isoformat():
+        return
+
+    profiles = profiles or get_database()['user_profiles']
+    today = _day_start(day)
+    profile = profiles.find_one_and_update(
+        {'user_id': user_id, 'last_review_date': today - datetime.timedelta(days=1)},
+        {'$inc': {'current_streak': 1}, '$set': {'last_review_date': today}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if profile is None:
+        profile = profiles.find_one_and_update(
+            {'user_id': user_id, '$or': [{'last_review_date': {'$lt': today}}, {'last_review_date': None}]},
+            {'$set': {'current_streak': 1, 'last_review_date': today}},
+            return_document=ReturnDocument.AFTER,
+        )
+    if profile is not None:
+        profiles.update_one({'user_id': user_id}, {'$max': {'longest_streak': profile['current_streak']}})
+    cache.set(key, day.isoformat(), 24 * 60 * 60)
+
+
+def streaks(review_days, today):
+    """``(current, longest)`` streaks from a set of review dates."""
+    longest = current = run = 0
+    previous = None
+    for day in sorted(review_days):
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    if previous is not None and (today - previous).days <= 1:
+        current = run
+    return current, longest
+
+
+COUNTERS_PROJECTION = {'total_words_learned': 1, 'words_in_progress': 1}
+
+
+def _counters(profile):
+    if profile is None:
+        return None
+    return profile.get('total_words_learned', 0), profile.get('words_in_progress', 0)
+
+
+def read_counters(user_id, db=None):
+    """The profile's ``(total_words_learned, words_in_progress)``, or ``None`` without a profile."""
+    return _counters((db or get_database())['user_profiles'].find_one({'user_id': user_id}, COUNTERS_PROJECTION))
+
+
+async def aread_counters(user_id, db):
+    return _counters(await db['user_profiles'].find_one({'user_id': user_id}, COUNTERS_PROJECTION))
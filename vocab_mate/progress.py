@@ -0,0 +1,135 @@
+"""
+Helpers around ``UserProgress`` rows.
+
+``UserProgress.word_id`` holds the ``_id`` of a ``words`` document rather than
+a foreign key, so the ORM cannot join it. ``attach_words`` resolves the words
+for a whole page of progress rows with one ``$in`` query through
+``WordRepository.by_object_ids``.
+
+``apply_reviews`` records a whole study session at once: one read of the
+cards involved and one ordered bulk write, instead of a request per card.
+
+Reviews are written with pymongo keyed on ``(user_id, word_id)``: ``word_id``
+is the model's primary key, so an ORM save would update every user's card
+for that word.
+"""
+from django.utils import timezone
+from pymongo import UpdateOne
+
+from .mongo import get_database
+from .profiles import apply_progress_change, record_review_day
+from .repositories import WordRepository, _object_id
+from .scheduling import next_review_state, quality_from_correct, schedule_review
+
+SM2_FIELDS = ('ease_factor', 'interval_days', 'learning_streak', 'times_reviewed')
+REVIEW_FIELDS = (*SM2_FIELDS, 'mastery_score', 'review_schedule', 'last_reviewed')
+
+
+def attach_words(progress_rows):
+    """Set ``progress.word`` (or ``None`` when the word is gone) on every row."""
+    progress_rows = list(progress_rows)
+    words = WordRepository().by_object_ids(_object_id(progress.word_id) for progress in progress_rows)
+    for progress in progress_rows:
+        progress.word = words.get(_object_id(progress.word_id))
+    return progress_rows
+
+
+def backfill_review_schedule(db=None):
+    """
+    Make never-scheduled cards due from their creation, so the indexed due
+    query finds them. Returns how many cards changed.
+    """
+    result = (db or get_database())['user_progress'].update_many(
+        {'review_schedule': None},
+        [{'$set': {'review_schedule': {'$ifNull': ['$created_at', timezone.now()]}}}],
+    )
+    return result.modified_count
+
+
+def save_review(progress, quality, reviewed_at=None):
+    """Apply one graded review to ``progress`` and store it on that user's card only."""
+    reviewed_at = reviewed_at or timezone.now()
+    schedule_review(progress, quality, reviewed_at)
+    progress.last_reviewed = reviewed_at
+    get_database()['user_progress'].update_one(
+        {'user_id': progress.user_id, 'word_id': progress.word_id},
+        {'$set': {field: getattr(progress, field) for field in REVIEW_FIELDS}},
+    )
+    # The ORM signals do not see this write either
+    record_review_day(progress.user_id, timezone.localdate(reviewed_at))
+    return progress
+
+
+def apply_reviews(user_id, reviews):
+    """
+    Apply ``reviews`` (``{'word_id': ObjectId, 'correct': bool, 'reviewed_at': datetime}``,
+    in the order they happened) to the user's cards, creating cards on first review.
+
+    Returns one result per review with the card's schedule after that review;
+    reviews of words that do not exist are reported as invalid and skipped.
+    """
+    if not reviews:
+        return []
+
+    collection = get_database()['user_progress']
+    known = WordRepository().by_object_ids(review['word_id'] for review in reviews)
+    word_ids = list(dict.fromkeys(review['word_id'] for review in reviews if review['word_id'] in known))
+    cards = {
+        doc['word_id']: doc for doc in collection.find(
+            {'user_id': user_id, 'word_id': {'$in': word_ids}},
+            {'_id': 1, 'word_id': 1, **{field: 1 for field in SM2_FIELDS}},
+        )
+    }
+    new_word_ids = [word_id for word_id in word_ids if word_id not in cards]
+    for word_id in new_word_ids:
+        cards[word_id] = {'word_id': word_id, 'new': True}
+
+    results = []
+    created = set()
+    for review in reviews:
+        if review['word_id'] not in known:
+            results.append({
+                'word_id': str(review['word_id']),
+                'status': 'invalid',
+                'errors': {'word_id': ['Unknown word']},
+            })
+            continue
+        card = cards[review['word_id']]
+        card.update(next_review_state(card, quality_from_correct(review['correct']), review['reviewed_at']))
+        card['last_reviewed'] = review['reviewed_at']
+        first_of_new_card = card.get('new') and review['word_id'] not in created
+        if first_of_new_card:
+            created.add(review['word_id'])
+        results.append({
+            'word_id': str(review['word_id']),
+            'status': 'created' if first_of_new_card else 'updated',
+            'times_reviewed': card['times_reviewed'],
+            'learning_streak': card['learning_streak'],
+            'mastery_score': card['mastery_score'],
+            'interval_days': card['interval_days'],
+            'review_schedule': card['review_schedule'],
+        })
+
+    if not word_ids:
+        return results
+
+    now = timezone.now()
+    operations = []
+    for word_id in word_ids:
+        card = cards[word_id]
+        fields = {field: card[field] for field in REVIEW_FIELDS}
+        if card.get('new'):
+            operations.append(UpdateOne(
+                {'user_id': user_id, 'word_id': word_id},
+                {'$set': fields, '$setOnInsert': {'is_learned': False, 'created_at': now}},
+                upsert=True,
+            ))
+        else:
+            operations.append(UpdateOne({'_id': card['_id']}, {'$set': fields}))
+    collection.bulk_write(operations, ordered=True)
+
+    # The ORM signals do not see bulk writes, so update the profile counters here
+    apply_progress_change(user_id, in_progress=len(new_word_ids))
+    for day in sorted({timezone.localdate(review['reviewed_at']) for review in reviews if review['word_id'] in known}):
+        record_review_day(user_id, day)
+    return results
@@ -0,0 +1,136 @@
+"""
+Read-only access to the hot collections without the ORM.
+
+Every ORM query goes through djongo, which parses the SQL Django generates and
+rebuilds a MongoDB query from it on each call. The repositories build those
+queries directly, read only the fields the API returns (projections prepared
+once, at import) through the shared pooled client, and return plain dicts that
+the serializers render exactly like model instances. Writes keep using the ORM.
+
+Views use them when ``settings.FAST_READ_PATH`` is on; the ``a``-prefixed
+methods do the same reads through motor for the async views.
+"""
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from .models import UserProgress, Word
+from .mongo import async_database, shared_database
+
+
+def _object_id(value):
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(str(value))
+    except (InvalidId, TypeError):
+        return None
+
+
+def _fields(model, exclude=()):
+    return [field for field in model._meta.concrete_fields if field.attname not in exclude]
+
+
+class Repository:
+    model = None
+    collection_name = None
+    exclude = ()
+
+    projection = None
+    defaults = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = _fields(cls.model, cls.exclude)
+        cls.projection = {'_id': 0, **{field.attname: 1 for field in fields}}
+        # What the ORM would fill in for documents saved before a field existed
+        cls.defaults = {field.attname: field.get_default() for field in fields if field.has_default()}
+
+    def __init__(self, db=None):
+        self.db = db
+
+    @property
+    def collection(self):
+        return (self.db or shared_database())[self.collection_name]
+
+    def _row(self, document):
+        return {**self.defaults, **document}
+
+    def find(self, query, sort, limit):
+        return [self._row(doc) for doc in self.collection.find(query, self.projection, sort=sort, limit=limit)]
+
+    def find_one(self, query):
+        document = self.collection.find_one(query, self.projection)
+        return None if document is None else self._row(document)
+
+    def count(self, query):
+        return self.collection.count_documents(query)
+
+    @property
+    def async_collection(self):
+        return async_database()[self.collection_name]
+
+    async def afind(self, query, sort, limit):
+        cursor = self.async_collection.find(query, self.projection, sort=sort, limit=limit)
+        return [self._row(doc) async for doc in cursor]
+
+    async def acount(self, query):
+        return await self.async_collection.count_documents(query)
+
+
+class WordRepository(Repository):
+    model = Word
+    collection_name = 'words'
+    exclude = ('word_lower',)
+
+    def list_query(self, difficulty_level=None, tag=None):
+        query = {}
+        if difficulty_level:
+            query['difficulty_level'] = difficulty_level
+        if tag:
+            query['tags'] = tag
+        return query
+
+    def get(self, pk):
+        return self.find_one({'id': pk})
+
+    @staticmethod
+    def _object_ids_query(object_ids):
+        object_ids = list({oid for oid in object_ids if oid is not None})
+        return {'_id': {'$in': object_ids}} if object_ids else None
+
+    def by_object_ids(self, object_ids):
+        """``{ObjectId: word}`` for the given ``words._id`` values, fetched in one query."""
+        query = self._object_ids_query(object_ids)
+        if query is None:
+            return {}
+        documents = self.collection.find(query, {**self.projection, '_id': 1})
+        return {document.pop('_id'): self._row(document) for document in documents}
+
+    async def aby_object_ids(self, object_ids):
+        query = self._object_ids_query(object_ids)
+        if query is None:
+            return {}
+        documents = self.async_collection.find(query, {**self.projection, '_id': 1})
+        return {document.pop('_id'): self._row(document) async for document in documents}
+
+
+class ProgressRepository(Repository):
+    model = UserProgress
+    collection_name = 'user_progress'
+    exclude = ('user_id', 'ease_factor')
+
+    def list_query(self, user_id):
+        return {'user_id': user_id}
+
+    def attach_words(self, rows):
+        """Like ``progress.attach_words``, for rows read here."""
+        words = WordRepository(self.db).by_object_ids(_object_id(row['word_id']) for row in rows)
+        for row in rows:
+            row['word'] = words.get(_object_id(row['word_id']))
+        return rows
+
+    async def aattach_words(self, rows):
+        words = await WordRepository().aby_object_ids(_object_id(row['word_id']) for row in rows)
+        for row in rows:
+            row['word'] = words.get(_object_id(row['word_id']))
+        return rows
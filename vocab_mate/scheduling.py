@@ -0,0 +1,67 @@
+"""
+SM-2 style spaced-repetition scheduling.
+
+Each review is graded 0-5 (``correct``/``incorrect`` map to 4/1). A passing
+grade grows the interval (1 day, 6 days, then interval × ease factor), a
+failing one starts the card over; the ease factor drifts with the grades.
+``UserProgress.learning_streak`` counts the consecutive passing reviews.
+"""
+import datetime
+import math
+
+from django.utils import timezone
+
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+MASTERY_INTERVAL_DAYS = 21  # a card due three weeks out counts as fully mastered
+
+
+def quality_from_correct(correct):
+    return 4 if correct else 1
+
+
+def next_review_state(state, quality, reviewed_at=None):
+    """
+    Apply one review to ``state`` (a mapping with the SM-2 fields of a
+    ``UserProgress``) and return the new values of the fields that change.
+    """
+    reviewed_at = reviewed_at or timezone.now()
+    ease = state.get('ease_factor') or 2.5
+    streak = state.get('learning_streak') or 0
+    interval = state.get('interval_days') or 0
+
+    if quality >= PASSING_QUALITY:
+        if streak == 0:
+            interval = 1
+        elif streak == 1:
+            interval = 6
+        else:
+            interval = max(math.ceil(interval * ease), interval + 1)
+        streak += 1
+    else:
+        streak = 0
+        interval = 1
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    return {
+        'ease_factor': round(ease, 3),
+        'interval_days': interval,
+        'learning_streak': streak,
+        'times_reviewed': (state.get('times_reviewed') or 0) + 1,
+        'mastery_score': round(min(interval / MASTERY_INTERVAL_DAYS, 1.0), 3),
+        'review_schedule': reviewed_at + datetime.timedelta(days=interval),
+    }
+
+
+def schedule_review(progress, quality, reviewed_at=None):
+    """Apply a review to a ``UserProgress`` instance (not saved)."""
+    state = {
+        'ease_factor': progress.ease_factor,
+        'learning_streak': progress.learning_streak,
+        'interval_days': progress.interval_days,
+        'times_reviewed': progress.times_reviewed,
+    }
+    for field, value in next_review_state(state, quality, reviewed_at).items():
+        setattr(progress, field, value)
+    return progress
@@ -0,0 +1,155 @@
+"""
+Word search and autocomplete backed by MongoDB indexes.
+
+``SearchFilter`` turns ``?search=`` into ``icontains`` lookups, which djongo
+runs as unanchored regexes over the whole ``words`` collection. Here the
+terms go to a ``$text`` query on ``word``/``definition`` instead, ranked by
+text score with matches on the headword weighted highest. Autocomplete reads
+an index on the case-folded headword, ``Word.word_lower``, and tag filters and
+facets a multikey index on the ``tags`` array.
+"""
+import re
+import threading
+
+from pymongo import TEXT, UpdateOne
+from rest_framework.filters import SearchFilter
+
+from .mongo import get_database
+
+TEXT_INDEX_NAME = 'word_definition_text'
+PREFIX_INDEX_NAME = 'word_lower_prefix'
+TAGS_INDEX_NAME = 'tags_multikey'
+LIST_FIELDS = ('tags', 'synonyms', 'antonyms')
+
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+def ensure_search_indexes(db=None):
+    """Create the text, prefix and tag indexes if they are missing (a no-op when they exist)."""
+    global _indexes_ready
+    with _indexes_lock:
+        if not _indexes_ready:
+            words = (db or get_database())['words']
+            words.create_index(
+                [('word', TEXT), ('definition', TEXT)],
+                weights={'word': 10, 'definition': 1},
+                name=TEXT_INDEX_NAME,
+            )
+            words.create_index('word_lower', name=PREFIX_INDEX_NAME)
+            words.create_index('tags', name=TAGS_INDEX_NAME)
+            _indexes_ready = True
+
+
+def search_word_ids(term, limit=100):
+    """Ids of the words matching ``term``, best match first."""
+    db = get_database()
+    ensure_search_indexes(db)
+    words = db['words']
+
+    cursor = words.find(
+        {'$text': {'$search': term}},
+        {'id': 1, 'score': {'$meta': 'textScore'}},
+    ).sort([('score', {'$meta': 'textScore'})]).limit(limit)
+    ids = [doc['id'] for doc in cursor]
+    if ids:
+        return ids
+
+    # Text search matches whole words only; let a partial word match headwords by prefix
+    return [doc['id'] for doc in suggest_words(term, limit, db)]
+
+
+def suggest_words(prefix, limit=10, db=None):
+    """
+    ``{'id', 'word'}`` for headwords starting with ``prefix``, case-insensitively.
+
+    An anchored, case-sensitive regex on the indexed ``word_lower`` field is
+    answered from the index bounds alone, so this stays a short index scan
+    however large the vocabulary is.
+    """
+    db = db or get_database()
+    ensure_search_indexes(db)
+    cursor = db['words'].find(
+        {'word_lower': {'$regex': '^' + re.escape(prefix.casefold())}},
+        {'_id': 0, 'id': 1, 'word': 1},
+    ).sort('word_lower', 1).limit(limit)
+    return list(cursor)
+
+
+def backfill_word_lower(db=None, batch_size=1000):
+    """Fill ``word_lower`` on words saved before the field existed. Returns how many were updated."""
+    words = (db or get_database())['words']
+    updated = 0
+    batch = []
+    for doc in words.find({'word_lower': {'$in': [None, '']}}, {'word': 1}):
+        batch.append(UpdateOne({'_id': doc['_id']}, {'$set': {'word_lower': doc['word'].casefold()}}))
+        if len(batch) == batch_size:
+            updated += words.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += words.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+def convert_word_lists(db=None):
+    """
+    Turn comma-separated ``tags``/``synonyms``/``antonyms`` strings left by older
+    versions into arrays, server-side in one update. Returns how many words changed.
+    """
+    def as_array(field):
+        parts = {'$map': {'input': {'$split': [f'${field}', ',']}, 'as': 'part', 'in': {'$trim': {'input': '$$part'}}}}
+        return {'$switch': {
+            'branches': [
+                {'case': {'$eq': [{'$type': f'${field}'}, 'string']},
+                 'then': {'$filter': {'input': parts, 'as': 'part', 'cond': {'$ne': ['$$part', '']}}}},
+                {'case': {'$in': [{'$type': f'${field}'}, ['missing', 'null']]}, 'then': []},
+            ],
+            'default': f'${field}',
+        }}
+
+    words = (db or get_database())['words']
+    result = words.update_many(
+        {'$or': [{field: {'$not': {'$type': 'array'}}} for field in LIST_FIELDS]},
+        [{'$set': {field: as_array(field) for field in LIST_FIELDS}}],
+    )
+    return result.modified_count
+
+
+def tag_counts(limit=50, db=None):
+    """``{'tag', 'count'}`` for the most used tags, most used first."""
+    return list((db or get_database())['words'].aggregate([
+        {'$unwind': '$tags'},
+        {'$group': {'_id': '$tags', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}},
+        {'$limit': limit},
+        {'$project': {'_id': 0, 'tag': '$_id', 'count': 1}},
+    ]))
+
+
+class WordSearchFilter(SearchFilter):
+    """
+    ``?search=`` for words, answered from the text index.
+
+    Without an explicit ``?ordering=`` the result is a list ranked by
+    relevance; with one, the matches stay a queryset so it can be ordered.
+    Only the best ``search_limit`` matches are kept; when there were more,
+    ``request.search_truncated`` is set and the page says so.
+    """
+    search_limit = 100
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        # One extra id tells whether the limit cut anything off
+        ids = search_word_ids(' '.join(terms), limit=self.search_limit + 1)
+        if len(ids) > self.search_limit:
+            ids = ids[:self.search_limit]
+            request.search_truncated = True
+        matches = queryset.filter(id__in=ids)
+        if request.query_params.get('ordering'):
+            return matches
+
+        by_id = {word.id: word for word in matches}
+        return [by_id[word_id] for word_id in ids if word_id in by_id]
@@ -1,3 +1,4 @@
+from bson import ObjectId
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Word, UserProgress, UserProfile
@@ -10,36 +11,76 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class StringListField(serializers.ListField):
+    """A list of strings; a comma-separated string is accepted too and split."""
+    child = serializers.CharField(max_length=100)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = data.split(',')
+        if isinstance(data, (list, tuple)):
+            data = [item for item in data if not isinstance(item, str) or item.strip()]
+        return list(dict.fromkeys(super().to_internal_value(data)))
+
+
 class WordSerializer(serializers.ModelSerializer):
+    tags = StringListField(required=False, allow_empty=True)
+    synonyms = StringListField(required=False, allow_empty=True)
+    antonyms = StringListField(required=False, allow_empty=True)
+
     class Meta:
         model = Word
-        fields = '__all__'
+        exclude = ['word_lower']
         read_only_fields = ['created_at', 'updated_at']
 
 
 class UserProgressSerializer(serializers.ModelSerializer):
     word = WordSerializer(read_only=True)
-    word_id = serializers.CharField(write_only=True)  # ObjectId as string
+    word_id = serializers.CharField()  # ObjectId as string; the card's key in /api/progress/{word_id}/review/
 
     class Meta:
         model = UserProgress
         fields = [
             'word', 'word_id', 'is_learned', 'times_reviewed', 
             'last_reviewed', 'created_at', 'learning_streak', 
-            'mastery_score', 'review_schedule'
+            'mastery_score', 'review_schedule', 'interval_days'
         ]
-        read_only_fields = ['last_reviewed', 'created_at']
+        read_only_fields = ['last_reviewed', 'created_at', 'interval_days']
+
+
+class ReviewSubmissionSerializer(serializers.Serializer):
+    quality = serializers.IntegerField(min_value=0, max_value=5, required=False)
+    correct = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if 'quality' not in attrs and 'correct' not in attrs:
+            raise serializers.ValidationError("Either quality (0-5) or correct is required")
+        return attrs
+
+
+class BulkReviewItemSerializer(serializers.Serializer):
+    word_id = serializers.CharField()
+    correct = serializers.BooleanField()
+    reviewed_at = serializers.DateTimeField(required=False)
+
+    def validate_word_id(self, value):
+        if not ObjectId.is_valid(value):
+            raise serializers.ValidationError("Not a valid word id")
+        return ObjectId(value)
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = [
-            'total_words_learned', 'current_streak', 'longest_streak',
-            'preferred_difficulty', 'daily_goal', 'learning_preferences',
+            'total_words_learned', 'words_in_progress', 'current_streak', 'longest_streak',
+            'last_review_date', 'preferred_difficulty', 'daily_goal', 'learning_preferences',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = [
+            'total_words_learned', 'words_in_progress', 'current_streak', 'longest_streak',
+            'last_review_date', 'created_at', 'updated_at'
+        ]
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -70,4 +111,13 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 class DailySentenceSerializer(serializers.Serializer):
     hindi = serializers.CharField()
     english = serializers.CharField()
-    german = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
+    german = serializers.CharField(required=False, allow_blank=True)
+
+class WordSuggestionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    word = serializers.CharField()
+
+
+class TagCountSerializer(serializers.Serializer):
+    tag = serializers.CharField()
+    count = serializers.IntegerField()
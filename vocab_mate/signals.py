@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import forget_user
+from .caching import bump_vocabulary_version
+from .models import UserProgress, Word
+from .profiles import apply_progress_change
+from .stats import invalidate_word_count
+
+
+@receiver(post_save, sender=Word)
+def word_saved(sender, instance, created, **kwargs):
+    if created:
+        invalidate_word_count()
+    bump_vocabulary_version()
+
+
+@receiver(post_delete, sender=Word)
+def word_deleted(sender, instance, **kwargs):
+    invalidate_word_count()
+    bump_vocabulary_version()
+
+
+@receiver(post_save, sender=UserProgress)
+def progress_saved(sender, instance, created, **kwargs):
+    was_learned = None if created else getattr(instance, '_loaded_is_learned', None)
+    learned = in_progress = 0
+    if created:
+        learned, in_progress = (1, 0) if instance.is_learned else (0, 1)
+    elif was_learned is not None and was_learned != instance.is_learned:
+        learned, in_progress = (1, -1) if instance.is_learned else (-1, 1)
+
+    reviewed = instance.times_reviewed > (getattr(instance, '_loaded_times_reviewed', None) or 0)
+    reviewed_on = timezone.localdate(instance.last_reviewed) if reviewed and instance.last_reviewed else None
+
+    apply_progress_change(instance.user_id, learned, in_progress, reviewed_on)
+    # A second save of the same instance must not count the change again
+    instance._loaded_is_learned = instance.is_learned
+    instance._loaded_times_reviewed = instance.times_reviewed
+
+
+@receiver(post_delete, sender=UserProgress)
+def progress_deleted(sender, instance, **kwargs):
+    learned, in_progress = (-1, 0) if instance.is_learned else (0, -1)
+    apply_progress_change(instance.user_id, learned, in_progress)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
@@ -0,0 +1,58 @@
+"""
+Learning statistics with as few round trips as possible.
+
+The vocabulary size is cached and dropped by the ``Word`` signals in
+``signals.py``; the per-user split is one grouped aggregation served by the
+``(user_id, is_learned)`` index.
+"""
+from django.core.cache import cache
+
+from .mongo import get_database
+
+WORD_COUNT_KEY = 'words:count'
+# Other processes only see an invalidation through a shared cache backend,
+# so the cached count also expires on its own
+WORD_COUNT_TIMEOUT = 300
+
+
+def word_count(db=None):
+    count = cache.get(WORD_COUNT_KEY)
+    if count is None:
+        count = (db or get_database())['words'].count_documents({})
+        cache.set(WORD_COUNT_KEY, count, WORD_COUNT_TIMEOUT)
+    return count
+
+
+async def aword_count(db):
+    """``word_count`` through an async (motor) database."""
+    count = cache.get(WORD_COUNT_KEY)
+    if count is None:
+        count = await db['words'].count_documents({})
+        cache.set(WORD_COUNT_KEY, count, WORD_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_word_count():
+    cache.delete(WORD_COUNT_KEY)
+
+
+def _breakdown_pipeline(user_id):
+    return [
+        {'$match': {'user_id': user_id}},
+        {'$group': {'_id': '$is_learned', 'n': {'$sum': 1}}},
+    ]
+
+
+def progress_breakdown(user_id, db=None):
+    """``(learned, in_progress)`` word counts for a user."""
+    counts = {True: 0, False: 0}
+    for group in (db or get_database())['user_progress'].aggregate(_breakdown_pipeline(user_id)):
+        counts[bool(group['_id'])] += group['n']
+    return counts[True], counts[False]
+
+
+async def aprogress_breakdown(user_id, db):
+    counts = {True: 0, False: 0}
+    async for group in db['user_progress'].aggregate(_breakdown_pipeline(user_id)):
+        counts[bool(group['_id'])] += group['n']
+    return counts[True], counts[False]
@@ -0,0 +1,95 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from vocab_mate.daily_sentences import DailySentencesUnavailable, DailySentenceStore
+
+
+class FakeLockStore(DailySentenceStore):
+    """The lock protocol over in-memory state; every I/O step is recorded."""
+    poll_interval = 0
+    payload = {"date": "2024-05-01", "sentences": [], "status": "newly_generated", "total_sentences_in_db": 0}
+
+    def __init__(self, busy_polls=0, stored_after=None, fail=False):
+        super().__init__()
+        self.busy_polls = busy_polls  # acquires refused before the lock frees up
+        self.stored_after = stored_after  # loads that miss before someone else's set appears
+        self.fail = fail
+        self.steps = []
+        self.loads = 0
+
+    def load(self, date):
+        self.steps.append('load')
+        self.loads += 1
+        if self.stored_after is not None and self.loads > self.stored_after:
+            return dict(self.payload, status="cached")
+        return None
+
+    def _acquire(self, date):
+        self.steps.append('acquire')
+        if self.busy_polls:
+            self.busy_polls -= 1
+            return None
+        return 'owner'
+
+    def _release(self, date, owner):
+        self.steps.append('release')
+
+    def _sleep(self):
+        self.steps.append('sleep')
+
+    def _produce(self, date):
+        self.steps.append('produce')
+        if self.fail:
+            raise RuntimeError("generation failed")
+        return self.payload
+
+    async def aload(self, date):
+        return self.load(date)
+
+    async def _aacquire(self, date):
+        return self._acquire(date)
+
+    async def _arelease(self, date, owner):
+        self._release(date, owner)
+
+    async def _asleep(self):
+        self._sleep()
+
+    async def _aproduce(self, date):
+        return self._produce(date)
+
+
+class GenerateOnceTests(SimpleTestCase):
+    def _both(self, **kwargs):
+        """Run the protocol through the sync and the async driver; returns ``(result, steps)`` for each."""
+        runs = []
+        for drive in (lambda store, steps: store._run(steps),
+                      lambda store, steps: asyncio.run(store._arun(steps))):
+            store = FakeLockStore(**kwargs)
+            runs.append((drive(store, store._generate_once('2024-05-01')), store.steps))
+        return runs
+
+    def test_free_lock_produces_once(self):
+        for result, steps in self._both():
+            self.assertEqual(result["status"], "newly_generated")
+            self.assertEqual(steps, ['load', 'acquire', 'load', 'produce', 'release'])
+
+    def test_waits_for_the_lock_holder(self):
+        for result, steps in self._both(busy_polls=5, stored_after=2):
+            self.assertEqual(result["status"], "cached")
+            self.assertEqual(steps, ['load', 'acquire', 'sleep', 'load', 'acquire', 'sleep', 'load'])
+
+    def test_lock_is_released_when_generation_fails(self):
+        for drive in (lambda store, steps: store._run(steps),
+                      lambda store, steps: asyncio.run(store._arun(steps))):
+            store = FakeLockStore(fail=True)
+            with self.assertRaises(RuntimeError):
+                drive(store, store._generate_once('2024-05-01'))
+            self.assertEqual(store.steps[-2:], ['produce', 'release'])
+
+    def test_gives_up_after_the_wait_timeout(self):
+        store = FakeLockStore(busy_polls=10 ** 6)
+        store.wait_timeout = 0
+        with self.assertRaises(DailySentencesUnavailable):
+            store._run(store._generate_once('2024-05-01'))
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from vocab_mate.generate_sentence import DailySentenceGenerator, SentenceHashIndex
+
+
+class ChunkSizeTests(SimpleTestCase):
+    def test_small_count_is_one_chunk(self):
+        self.assertEqual(DailySentenceGenerator.chunk_sizes(20), [20])
+
+    def test_chunks_are_balanced(self):
+        self.assertEqual(DailySentenceGenerator.chunk_sizes(30), [15, 15])
+
+    def test_hundred_fits_in_one_wave(self):
+        sizes = DailySentenceGenerator.chunk_sizes(100)
+        self.assertEqual(sum(sizes), 100)
+        self.assertLessEqual(len(sizes), DailySentenceGenerator.concurrency)
+
+    def test_chunks_never_exceed_the_cap(self):
+        sizes = DailySentenceGenerator.chunk_sizes(500)
+        self.assertEqual(sum(sizes), 500)
+        self.assertLessEqual(max(sizes), DailySentenceGenerator.max_chunk_size)
+
+    def test_estimated_calls_follow_the_chunks(self):
+        self.assertEqual(DailySentenceGenerator.estimated_llm_calls(100), 8)
+        self.assertEqual(DailySentenceGenerator.estimated_llm_calls(100, streaming=True), 1)
+
+
+class FakeSentences:
+    """The ``DailySentence.objects`` calls ``SentenceHashIndex`` makes, over a list of rows."""
+
+    def __init__(self):
+        self.rows = []  # (id, hash, english)
+        self.inserted = 0
+        self.full_loads = 0
+
+    def store(self, *ids):
+        self.rows.extend((row_id, f'h{row_id}', f'sentence {row_id}') for row_id in ids)
+        self.inserted += len(ids)
+
+    def filter(self, id__gt):
+        return FakeQuery([row for row in self.rows if row[0] > id__gt])
+
+    def all(self):
+        self.full_loads += 1
+        return FakeQuery(list(self.rows))
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def order_by(self, field):
+        return FakeQuery(sorted(self.rows))
+
+    def values_list(self, *fields):
+        return self.rows
+
+
+class SentenceHashIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.table = FakeSentences()
+        patches = [
+            mock.patch('vocab_mate.generate_sentence.DailySentence', objects=self.table),
+            mock.patch('vocab_mate.generate_sentence.inserted_sentences', lambda: self.table.inserted),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.index = SentenceHashIndex()
+
+    def test_refresh_pulls_new_rows_without_reloading(self):
+        self.table.store(1, 2)
+        self.index.refresh()
+        self.table.store(3)
+        self.index.refresh()
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.table.full_loads, 0)
+
+    def test_rows_stored_late_below_the_mark_are_picked_up(self):
+        self.table.store(1)
+        self.index.refresh()
+        self.table.store(5)  # another process reserved 2-4 first but has not inserted yet
+        self.index.refresh()
+        self.table.store(2, 3, 4)
+        self.index.refresh()
+        self.assertIn('h3', self.index)
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.table.full_loads, 1)
@@ -0,0 +1,31 @@
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import SimpleTestCase
+
+from vocab_mate.models import Word
+
+
+class StringListFieldTests(SimpleTestCase):
+    def setUp(self):
+        self.field = Word._meta.get_field('tags')
+        self.word = Word(word='apple', definition='a fruit')
+
+    def test_comma_string_is_split(self):
+        self.assertEqual(self.field.clean('food, drink,,food', self.word), ['food', 'drink'])
+
+    def test_non_list_is_a_validation_error(self):
+        with self.assertRaises(ValidationError):
+            self.field.clean(5, self.word)
+
+    def test_strings_are_never_saved(self):
+        self.assertEqual(self.field.get_db_prep_save('', connection), [])
+        self.assertEqual(self.field.get_db_prep_save('food', connection), ['food'])
+
+    def test_lookup_keeps_the_single_string(self):
+        self.assertEqual(self.field.get_prep_value('food'), 'food')
+
+    def test_form_shows_and_reads_comma_separated_text(self):
+        form_field = self.field.formfield()
+        self.assertEqual(form_field.prepare_value(['food', 'drink']), 'food, drink')
+        self.assertEqual(form_field.clean(''), [])
+        self.assertEqual(form_field.clean('food, drink'), ['food', 'drink'])
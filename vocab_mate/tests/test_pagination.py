@@ -0,0 +1,193 @@
+import base64
+import datetime
+
+from bson import ObjectId
+from django.db.models import Q
+from django.test import SimpleTestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from vocab_mate.models import UserProgress, Word
+from vocab_mate.pagination import UserProgressPagination, WordPagination
+from vocab_mate.repositories import ProgressRepository
+
+factory = APIRequestFactory()
+
+
+def _matches(document, query):
+    """The subset of MongoDB filters the paginator builds."""
+    for key, condition in query.items():
+        if key == '$and':
+            if not all(_matches(document, part) for part in condition):
+                return False
+        elif key == '$or':
+            if not any(_matches(document, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            for operator, value in condition.items():
+                if operator == '$lt' and not document[key] < value:
+                    return False
+                if operator == '$gt' and not document[key] > value:
+                    return False
+        elif document[key] != condition:
+            return False
+    return True
+
+
+class InMemoryRepository:
+    """What ``paginate_documents`` needs from a repository, over a list of dicts."""
+
+    def __init__(self, model, documents):
+        self.model = model
+        self.documents = documents
+
+    def find(self, query, sort, limit):
+        rows = [dict(document) for document in self.documents if _matches(document, query)]
+        for field, direction in reversed(sort):
+            rows.sort(key=lambda row: row[field], reverse=direction < 0)
+        return rows[:limit]
+
+    def count(self, query):
+        return sum(1 for document in self.documents if _matches(document, query))
+
+
+def _request(url):
+    return Request(factory.get(url))
+
+
+class DocumentPaginationTests(SimpleTestCase):
+    def setUp(self):
+        day = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+        # Several rows share a sort key, so only the word_id tiebreaker orders them
+        reviewed = [day, day, day, day + datetime.timedelta(hours=1), day + datetime.timedelta(hours=1),
+                    day + datetime.timedelta(hours=2), day + datetime.timedelta(hours=2)]
+        self.word_ids = [ObjectId('%024x' % i) for i in range(1, len(reviewed) + 1)]
+        # Shaped like ProgressRepository rows: no ``id``, the primary key is ``word_id``
+        self.repository = InMemoryRepository(UserProgress, [
+            {'word_id': word_id, 'last_reviewed': at, 'times_reviewed': 1}
+            for word_id, at in zip(self.word_ids, reviewed)
+        ])
+        # -last_reviewed, then -word_id
+        self.expected = [self._n(i) for i in (7, 6, 5, 4, 3, 2, 1)]
+
+    def _n(self, i):
+        return self.word_ids[i - 1]
+
+    def _page(self, url):
+        paginator = UserProgressPagination()
+        rows = paginator.paginate_documents(self.repository, {}, _request(url))
+        return paginator, [row['word_id'] for row in rows]
+
+    def test_forward_pages_cover_every_row_once(self):
+        seen = []
+        url = '/api/progress/?page_size=3'
+        while url:
+            paginator, ids = self._page(url)
+            seen.extend(ids)
+            url = paginator.next_link
+        self.assertEqual(seen, self.expected)
+
+    def test_first_page_has_no_previous_link(self):
+        paginator, ids = self._page('/api/progress/?page_size=3')
+        self.assertEqual(ids, self.expected[:3])
+        self.assertIsNone(paginator.previous_link)
+
+    def test_backward_pages_mirror_forward_pages(self):
+        forward = []
+        url = '/api/progress/?page_size=3'
+        while url:
+            paginator, ids = self._page(url)
+            forward.append(ids)
+            last = paginator
+            url = paginator.next_link
+
+        backward = [forward[-1]]
+        url = last.previous_link
+        while url:
+            paginator, ids = self._page(url)
+            backward.append(ids)
+            url = paginator.previous_link
+        self.assertEqual(list(reversed(backward)), forward)
+
+    def test_previous_page_has_a_next_link_back(self):
+        paginator, _ = self._page('/api/progress/?page_size=3')
+        paginator, _ = self._page(paginator.next_link)
+        previous, ids = self._page(paginator.previous_link)
+        self.assertEqual(ids, self.expected[:3])
+        self.assertIsNotNone(previous.next_link)
+
+    def test_count_only_on_request(self):
+        paginator, _ = self._page('/api/progress/?page_size=3')
+        self.assertIsNone(paginator.count)
+        paginator, _ = self._page('/api/progress/?page_size=3&count=true')
+        self.assertEqual(paginator.count, 7)
+
+    def test_ordering_fields_are_projected(self):
+        ordering = UserProgressPagination().get_ordering(_request('/api/progress/'), None, UserProgress)
+        self.assertEqual(ordering, ['-last_reviewed', '-word_id'])
+        for field in ordering:
+            self.assertIn(field.lstrip('-'), ProgressRepository.projection)
+
+    def test_orm_cursor_resolves_the_primary_key(self):
+        condition = UserProgressPagination()._beyond(
+            UserProgress, ['-last_reviewed', '-word_id'], ['2024-05-01T00:00:00+00:00', str(self._n(3))], False
+        )
+        self.assertIn(('word_id__lt', self._n(3)), condition.children[-1].children)
+
+
+class CursorTests(SimpleTestCase):
+    def _cursor(self, raw):
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def test_garbage_cursor_is_rejected(self):
+        paginator = WordPagination()
+        with self.assertRaises(NotFound):
+            paginator.decode_cursor(_request('/api/words/?cursor=not-a-cursor!'))
+
+    def test_cursor_of_the_wrong_length_is_rejected(self):
+        paginator = WordPagination()
+        with self.assertRaises(NotFound):
+            paginator._beyond_document(Word, ['word', 'id'], ['apple'], False)
+
+    def test_cursor_with_a_bad_value_is_rejected(self):
+        paginator = WordPagination()
+        with self.assertRaises(NotFound):
+            paginator._beyond(Word, ['word', 'id'], ['apple', 'not-an-id'], False)
+
+    def test_document_and_orm_cursors_describe_the_same_rows(self):
+        paginator = WordPagination()
+        values = ['apple', '3']
+        self.assertEqual(
+            paginator._beyond_document(Word, ['word', 'id'], values, False),
+            {'$or': [{'word': {'$gt': 'apple'}}, {'word': 'apple', 'id': {'$gt': 3}}]},
+        )
+        self.assertEqual(
+            paginator._beyond(Word, ['word', 'id'], values, False),
+            Q() | Q(word__gt='apple') | (Q(id__gt=3) & Q(word='apple')),
+        )
+
+    def test_reverse_cursor_flips_the_comparisons(self):
+        paginator = WordPagination()
+        self.assertEqual(
+            paginator._beyond_document(Word, ['word', 'id'], ['apple', 3], True),
+            {'$or': [{'word': {'$lt': 'apple'}}, {'word': 'apple', 'id': {'$lt': 3}}]},
+        )
+
+    def test_list_cursor_with_a_bad_offset_is_rejected(self):
+        paginator = WordPagination()
+        cursor = self._cursor('{"o":"x"}')
+        with self.assertRaises(NotFound):
+            paginator.paginate_queryset(list(range(50)), _request(f'/api/words/?cursor={cursor}'))
+
+    def test_truncated_search_is_flagged(self):
+        request = _request('/api/words/?search=apple')
+        request.search_truncated = True
+        paginator = WordPagination()
+        paginator.paginate_queryset(list(range(5)), request)
+        self.assertIs(paginator.get_paginated_data([])['truncated'], True)
+
+    def test_untruncated_list_has_no_flag(self):
+        paginator = WordPagination()
+        paginator.paginate_queryset(list(range(5)), _request('/api/words/?search=apple'))
+        self.assertNotIn('truncated', paginator.get_paginated_data([]))
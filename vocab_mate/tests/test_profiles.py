@@ -0,0 +1,67 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase
+
+from vocab_mate.models import UserProfile
+from vocab_mate.profiles import record_review_day, streaks
+
+
+class RecordReviewDayTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile = UserProfile.objects.create(
+            user_id=1, current_streak=3, longest_streak=3, last_review_date=datetime.date(2024, 5, 10)
+        )
+
+    def test_next_day_extends_streak(self):
+        record_review_day(1, datetime.date(2024, 5, 11))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.current_streak, 4)
+        self.assertEqual(self.profile.longest_streak, 4)
+
+    def test_later_day_restarts_streak(self):
+        record_review_day(1, datetime.date(2024, 5, 13))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.current_streak, 1)
+        self.assertEqual(self.profile.last_review_date, datetime.date(2024, 5, 13))
+
+    def test_backdated_review_is_ignored(self):
+        record_review_day(1, datetime.date(2024, 5, 8))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.current_streak, 3)
+        self.assertEqual(self.profile.last_review_date, datetime.date(2024, 5, 10))
+
+        # The streak goes on the next day as if the late sync never happened
+        record_review_day(1, datetime.date(2024, 5, 11))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.current_streak, 4)
+
+    def test_first_review_starts_streak(self):
+        UserProfile.objects.create(user_id=2)
+        record_review_day(2, datetime.date(2024, 5, 10))
+        profile = UserProfile.objects.get(user_id=2)
+        self.assertEqual(profile.current_streak, 1)
+        self.assertEqual(profile.last_review_date, datetime.date(2024, 5, 10))
+
+
+class StreakTests(SimpleTestCase):
+    today = datetime.date(2024, 5, 10)
+
+    def _days(self, *offsets):
+        return {self.today - datetime.timedelta(days=offset) for offset in offsets}
+
+    def test_no_reviews(self):
+        self.assertEqual(streaks(set(), self.today), (0, 0))
+
+    def test_streak_running_through_today(self):
+        self.assertEqual(streaks(self._days(0, 1, 2), self.today), (3, 3))
+
+    def test_streak_ending_yesterday_is_still_current(self):
+        self.assertEqual(streaks(self._days(1, 2), self.today), (2, 2))
+
+    def test_broken_streak_keeps_the_longest(self):
+        self.assertEqual(streaks(self._days(0, 5, 6, 7, 8), self.today), (1, 4))
+
+    def test_old_streak_is_not_current(self):
+        self.assertEqual(streaks(self._days(3, 4), self.today), (0, 2))
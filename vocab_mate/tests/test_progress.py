@@ -0,0 +1,63 @@
+import datetime
+from unittest import mock
+
+from bson import ObjectId
+from django.test import SimpleTestCase
+
+from vocab_mate.models import UserProgress
+from vocab_mate.progress import apply_reviews, save_review
+
+
+class InMemoryCollection:
+    """``update_one`` with equality filters and ``$set``, over a list of dicts."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def update_one(self, query, update):
+        for document in self.documents:
+            if all(document.get(key) == value for key, value in query.items()):
+                document.update(update['$set'])
+                return
+
+
+class SaveReviewTests(SimpleTestCase):
+    def setUp(self):
+        self.word_id = ObjectId()
+        self.cards = [
+            {'user_id': user_id, 'word_id': self.word_id, 'times_reviewed': 0, 'learning_streak': 0}
+            for user_id in (1, 2)
+        ]
+        patches = [
+            mock.patch('vocab_mate.progress.get_database',
+                       return_value={'user_progress': InMemoryCollection(self.cards)}),
+            mock.patch('vocab_mate.progress.record_review_day'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_review_only_touches_the_reviewers_card(self):
+        progress = UserProgress(user_id=1, word_id=self.word_id)
+        reviewed_at = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+        save_review(progress, 4, reviewed_at)
+
+        mine, theirs = self.cards
+        self.assertEqual(mine['times_reviewed'], 1)
+        self.assertEqual(mine['last_reviewed'], reviewed_at)
+        self.assertEqual(theirs, {'user_id': 2, 'word_id': self.word_id, 'times_reviewed': 0, 'learning_streak': 0})
+
+
+class ApplyReviewsTests(SimpleTestCase):
+    def test_unknown_words_are_reported_and_not_written(self):
+        db = {'user_progress': mock.Mock(**{'find.return_value': []})}
+        reviewed_at = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+        with mock.patch('vocab_mate.progress.get_database', return_value=db), \
+                mock.patch('vocab_mate.progress.WordRepository.by_object_ids', return_value={}), \
+                mock.patch('vocab_mate.progress.apply_progress_change') as progress_change:
+            word_id = ObjectId()
+            results = apply_reviews(1, [{'word_id': word_id, 'correct': True, 'reviewed_at': reviewed_at}])
+
+        self.assertEqual(results, [{'word_id': str(word_id), 'status': 'invalid', 'errors': {'word_id': ['Unknown word']}}])
+        db['user_progress'].bulk_write.assert_not_called()
+        progress_change.assert_not_called()
@@ -0,0 +1,20 @@
+import datetime
+
+from bson import ObjectId
+from django.test import SimpleTestCase
+
+from vocab_mate.models import UserProgress
+from vocab_mate.serializers import UserProgressSerializer
+
+
+class UserProgressSerializerTests(SimpleTestCase):
+    def test_fields_exist_on_the_model(self):
+        self.assertNotIn('id', UserProgressSerializer().fields)
+
+    def test_word_id_is_rendered_as_a_string(self):
+        word_id = ObjectId()
+        progress = UserProgress(
+            user_id=1, word_id=word_id, last_reviewed=datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+        )
+        progress.word = None
+        self.assertEqual(UserProgressSerializer(progress).data['word_id'], str(word_id))
@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase
+
+from vocab_mate.throttling import TokenBuckets, parse_rate
+
+
+class ParseRateTests(SimpleTestCase):
+    def test_drf_rate_syntax(self):
+        self.assertEqual(parse_rate('10/hour'), (10, 3600))
+        self.assertEqual(parse_rate('30/min'), (30, 60))
+        self.assertEqual(parse_rate('100/day'), (100, 86400))
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.buckets = TokenBuckets(capacity=4, period=40)  # one token every 10 seconds
+
+    def test_new_bucket_is_full(self):
+        self.assertEqual(self.buckets.wait_for('a', 4, now=0), 0)
+
+    def test_taking_empties_the_bucket(self):
+        self.buckets.take('a', 4, now=0)
+        self.assertEqual(self.buckets.wait_for('a', 1, now=0), 10)
+
+    def test_bucket_refills_over_time(self):
+        self.buckets.take('a', 4, now=0)
+        self.assertEqual(self.buckets.wait_for('a', 2, now=10), 10)
+        self.assertEqual(self.buckets.wait_for('a', 2, now=20), 0)
+
+    def test_refill_stops_at_capacity(self):
+        self.buckets.take('a', 1, now=0)
+        self.buckets.take('a', 4, now=1000)
+        self.assertEqual(self.buckets.wait_for('a', 1, now=1000), 10)
+
+    def test_keys_are_independent(self):
+        self.buckets.take('a', 4, now=0)
+        self.assertEqual(self.buckets.wait_for('b', 4, now=0), 0)
+
+    def test_cost_above_capacity_waits_for_a_full_bucket(self):
+        self.buckets.take('a', 4, now=0)
+        self.assertEqual(self.buckets.wait_for('a', 10, now=0), 40)
+
+    def test_least_recently_used_keys_are_forgotten(self):
+        buckets = TokenBuckets(capacity=1, period=60, max_keys=2)
+        for key in ('a', 'b', 'c'):
+            buckets.take(key, 1, now=0)
+        # 'a' was dropped and comes back full
+        self.assertEqual(buckets.wait_for('a', 1, now=0), 0)
+        self.assertGreater(buckets.wait_for('c', 1, now=0), 0)
@@ -0,0 +1,212 @@
+"""
+Throttling and request coalescing for the public daily-sentence endpoints.
+
+Anyone can call those endpoints, and a request that finds no sentence set for
+today starts paid LLM calls. A DRF throttle backed by in-memory token
+buckets guards them: a bucket holds up to N tokens, refills continuously
+at N per period, and a request goes through when it can take its cost.
+
+``LLMCostThrottle`` limits requests per client IP, and the LLM calls they
+would start per client IP and for all clients together. Requests served from
+the stored set, or that join a generation already in flight, start none.
+
+``SingleFlight`` and ``AsyncSingleFlight`` coalesce identical requests: while
+one generation runs, callers with the same key wait for it and share its
+result instead of queueing up their own.
+
+Budgets are per process, like the default cache.
+"""
+import asyncio
+import datetime
+import math
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+GLOBAL_KEY = '*'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """``'10/hour'`` -> ``(10, 3600)``, the syntax of DRF's ``DEFAULT_THROTTLE_RATES``."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class TokenBuckets:
+    """One token bucket per key, holding up to ``capacity`` tokens and refilling ``capacity`` per ``period``."""
+
+    def __init__(self, capacity, period, max_keys=100000):
+        self.capacity = capacity
+        self.refill = capacity / period
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def _tokens(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.refill)
+
+    def wait_for(self, key, cost, now=None):
+        """Seconds until ``key`` can take ``cost`` tokens (0 when it can now)."""
+        now = time.monotonic() if now is None else now
+        cost = min(cost, self.capacity)  # a request bigger than the bucket waits for a full one
+        with self._lock:
+            missing = cost - self._tokens(key, now)
+        return max(missing / self.refill, 0.0) if self.refill else math.inf
+
+    def take(self, key, cost, now=None):
+        now = time.monotonic() if now is None else now
+        cost = min(cost, self.capacity)
+        with self._lock:
+            self._buckets[key] = (self._tokens(key, now) - cost, now)
+            self._buckets.move_to_end(key)
+            # Forgotten keys come back full, which is where an idle bucket ends up anyway
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+# Held while a request is checked against all its buckets and charged to them
+_budget_lock = threading.Lock()
+
+
+def buckets_for(scope):
+    """The process-wide buckets of a ``DEFAULT_THROTTLE_RATES`` scope."""
+    rate = api_settings.DEFAULT_THROTTLE_RATES[scope]
+    with _buckets_lock:
+        buckets = _buckets.get((scope, rate))
+        if buckets is None:
+            buckets = _buckets[(scope, rate)] = TokenBuckets(*parse_rate(rate))
+        return buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle on token buckets, one set per ``DEFAULT_THROTTLE_RATES`` scope.
+
+    A request goes through only if every bucket it uses can cover its cost,
+    and only then is it charged to all of them.
+    """
+    scope = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_costs(self, request, view):
+        """``[(scope, key, tokens)]`` for the request; by default one token of the client IP's bucket."""
+        return [(self.scope, self.get_ident(request), 1)]
+
+    def allow_request(self, request, view):
+        return self.allow_costs(self.get_costs(request, view))
+
+    def allow_costs(self, costs):
+        costs = [(buckets_for(scope), key, tokens) for scope, key, tokens in costs if tokens > 0]
+        with _budget_lock:
+            now = time.monotonic()
+            self._wait = max((buckets.wait_for(key, tokens, now) for buckets, key, tokens in costs), default=0)
+            if self._wait == 0:
+                for buckets, key, tokens in costs:
+                    buckets.take(key, tokens, now)
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
+
+
+class LLMCostThrottle(TokenBucketThrottle):
+    """
+    Requests per client IP (scope ``daily_sentences``), and the LLM calls they
+    would start per client IP (``llm_calls_per_ip``) and across all clients
+    (``llm_calls_global``). The view estimates the calls with ``llm_cost(request)``.
+    """
+    scope = 'daily_sentences'
+
+    def get_costs(self, request, view):
+        return self.costs(self.get_ident(request), view.llm_cost(request))
+
+    def costs(self, ident, llm_calls):
+        return [
+            (self.scope, ident, 1),
+            ('llm_calls_per_ip', ident, llm_calls),
+            ('llm_calls_global', GLOBAL_KEY, llm_calls),
+        ]
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run one call per key at a time; callers arriving meanwhile wait and share its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """``SingleFlight`` for coroutines, per event loop."""
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()  # loop -> {key: task}
+
+    def _loop_calls(self):
+        return self._calls.setdefault(asyncio.get_running_loop(), {})
+
+    def in_flight(self, key):
+        return key in self._loop_calls()
+
+    async def do(self, key, coroutine_function):
+        calls = self._loop_calls()
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(coroutine_function())
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        # A caller that goes away must not cancel the generation the others are waiting for
+        return await asyncio.shield(task)
+
+
+def flight_key(request):
+    """
+    Method, path and sorted query string, on today's date: requests with the
+    same key get the same response. A flight started before midnight is not
+    joined after it.
+    """
+    query = '&'.join(sorted(request.META.get('QUERY_STRING', '').split('&')))
+    return f"{datetime.date.today()} {request.method} {request.path}?{query}"
@@ -0,0 +1,86 @@
+"""
+English→German translation memo.
+
+Lookups go through an in-process LRU first and the ``TranslationMemo`` table
+second, so only sentences that were never translated reach the model.
+"""
+import threading
+from collections import OrderedDict
+
+from django.utils import timezone
+
+from .models import TranslationMemo
+from .mongo import allocate_ids, get_database, insert_new
+
+
+class LRUCache:
+    """A small thread-safe least-recently-used mapping."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TranslationCache:
+    def __init__(self, maxsize=4096):
+        self.memory = LRUCache(maxsize)
+
+    def get_many(self, hashes):
+        """Return ``{hash: german}`` for every hash translated before."""
+        found = {}
+        missing = []
+        for h in hashes:
+            german = self.memory.get(h)
+            if german is None:
+                missing.append(h)
+            else:
+                found[h] = german
+
+        if missing:
+            for h, german in TranslationMemo.objects.filter(hash__in=missing).values_list('hash', 'german'):
+                self.memory.set(h, german)
+                found[h] = german
+        return found
+
+    def set_many(self, translations):
+        """Remember ``{hash: (english, german)}``; empty translations are never stored."""
+        translations = {h: pair for h, pair in translations.items() if pair[1]}
+        if not translations:
+            return
+
+        for h, (english, german) in translations.items():
+            self.memory.set(h, german)
+
+        existing = set(
+            TranslationMemo.objects.filter(hash__in=list(translations)).values_list('hash', flat=True)
+        )
+        # Another worker may memoise the same sentences meanwhile; insert_new skips those
+        now = timezone.now()
+        documents = [
+            {'hash': h, 'english': english, 'german': german, 'created_at': now}
+            for h, (english, german) in translations.items() if h not in existing
+        ]
+        for row_id, document in zip(allocate_ids(TranslationMemo._meta.db_table, len(documents)), documents):
+            document['id'] = row_id
+        insert_new(get_database()[TranslationMemo._meta.db_table], documents)
+
+translation_cache = TranslationCache()
@@ -1,21 +1,52 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    progress_list = async_views.progress_list
+    stats = async_views.user_stats
+    daily_sentences = async_views.daily_sentences
+    # Django 3.2 cannot stream a sync iterator under ASGI (see async_views)
+    daily_sentences_stream = async_views.stream_daily_sentences
+    export_words = async_views.export_view('words')
+    export_progress = async_views.export_view('progress')
+else:
+    progress_list = views.UserProgressListCreateView.as_view()
+    stats = views.user_stats
+    daily_sentences = views.GenerateDailySentencesView.as_view()
+    daily_sentences_stream = views.StreamDailySentencesView.as_view()
+    export_words = views.ExportView.as_view(export='words')
+    export_progress = views.ExportView.as_view(export='progress')
+
 urlpatterns = [
     # Authentication
     path('register/', views.UserRegistrationView.as_view(), name='register'),
     path('login/', views.UserLoginView.as_view(), name='login'),
     path('profile/', views.user_profile, name='profile'),
-    path('stats/', views.user_stats, name='stats'),
+    path('stats/', stats, name='stats'),
     
     # Words
     path('words/', views.WordListCreateView.as_view(), name='word-list'),
+    path('words/suggest/', views.word_suggestions, name='word-suggest'),
+    path('words/tags/', views.word_tags, name='word-tags'),
+    path('words/import/', views.import_words, name='word-import'),
     path('words/<int:pk>/', views.WordDetailView.as_view(), name='word-detail'),
     
     # User Progress
-    path('progress/', views.UserProgressListCreateView.as_view(), name='progress-list'),
+    path('progress/', progress_list, name='progress-list'),
+    path('progress/bulk/', views.bulk_reviews, name='progress-bulk'),
     path('progress/<int:pk>/', views.UserProgressDetailView.as_view(), name='progress-detail'),
+    path('progress/<str:word_id>/review/', views.submit_review, name='progress-review'),
+
+    # Spaced repetition
+    path('review/due/', views.reviews_due, name='review-due'),
+
+    # Export
+    path('export/words/', export_words, name='export-words'),
+    path('export/progress/', export_progress, name='export-progress'),
 
     # Daily Sentences
-    path('daily-sentences/', views.GenerateDailySentencesView.as_view(), name='daily-sentences'),
+    path('daily-sentences/', daily_sentences, name='daily-sentences'),
+    path('daily-sentences/stream/', daily_sentences_stream, name='daily-sentences-stream'),
 ]
@@ -1,22 +1,59 @@
+import io
+import json
+
+from bson import ObjectId
 from rest_framework import generics, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.models import User
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
+from django_filters.rest_framework import DjangoFilterBackend
 
-from vocab_mate.generate_sentence import DailySentenceGenerator
+from vocab_mate.daily_sentences import DailySentenceStore, DailySentencesUnavailable
+from .authentication import ClaimsRefreshToken
+from .caching import CachedResponseMixin
+from .exporters import export_lines, gzip_chunks
+from .importers import FORMATS as IMPORT_FORMATS, ON_CONFLICT, WordImporter, detect_format
 from .models import Word, UserProgress
+from .mongo import shared_database
+from .pagination import UserProgressPagination, WordPagination
+from .profiles import read_counters
+from .progress import apply_reviews, attach_words, save_review
+from .renderers import NDJSONRenderer
+from .repositories import ProgressRepository, WordRepository
+from .scheduling import quality_from_correct
+from .search import WordSearchFilter, suggest_words, tag_counts
+from .stats import progress_breakdown, word_count
+from .throttling import LLMCostThrottle, SingleFlight, flight_key
 from .serializers import (
     DailySentenceSerializer,
     WordSerializer, 
     UserProgressSerializer, 
     UserSerializer,
-    UserRegistrationSerializer
+    UserRegistrationSerializer,
+    BulkReviewItemSerializer,
+    ReviewSubmissionSerializer,
+    TagCountSerializer,
+    WordSuggestionSerializer
 )
 
+MAX_SUGGESTIONS = 20
+MAX_TAGS = 200
+MAX_DUE_REVIEWS = 100
+MAX_BULK_REVIEWS = 500
+DIFFICULTY_LEVELS = [value for value, _ in Word._meta.get_field('difficulty_level').choices]
+
 
 @extend_schema_view(
     get=extend_schema(
@@ -29,11 +66,17 @@ from .serializers import (
                 location=OpenApiParameter.QUERY,
                 description='Filter by difficulty level (beginner, intermediate, advanced)'
             ),
+            OpenApiParameter(
+                name='tag',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Only words with this tag'
+            ),
             OpenApiParameter(
                 name='search',
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Search in word and definition fields'
+                description='Search in word and definition fields, best matches first'
             ),
             OpenApiParameter(
                 name='ordering',
@@ -48,14 +91,114 @@ from .serializers import (
         description="Add a new word to the vocabulary database"
     )
 )
-class WordListCreateView(generics.ListCreateAPIView):
+class WordListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
     queryset = Word.objects.all()
     serializer_class = WordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, WordSearchFilter, OrderingFilter]
+    pagination_class = WordPagination
     filterset_fields = ['difficulty_level']
     search_fields = ['word', 'definition']
     ordering_fields = ['word', 'created_at', 'difficulty_level']
 
+    def list(self, request, *args, **kwargs):
+        difficulty_level = request.query_params.get('difficulty_level')
+        if (not settings.FAST_READ_PATH or request.query_params.get('search')
+                or difficulty_level not in (None, *DIFFICULTY_LEVELS)):
+            # Search ranking and filter validation errors stay on the ORM path
+            return super().list(request, *args, **kwargs)
+
+        repository = WordRepository()
+        query = repository.list_query(difficulty_level, request.query_params.get('tag', '').strip())
+        page = self.paginator.paginate_documents(repository, query, request, view=self)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tag = self.request.query_params.get('tag', '').strip()
+        if tag:
+            # Matches words whose tags array contains ``tag``, read from the multikey index
+            queryset = queryset.filter(tags=tag)
+        return queryset
+
+
+@extend_schema(
+    summary="Tag counts",
+    description="The most used tags with the number of words carrying each, most used first",
+    parameters=[
+        OpenApiParameter(name='limit', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                         description=f'Number of tags, at most {MAX_TAGS} (default 50)'),
+    ],
+    responses={200: TagCountSerializer(many=True)}
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def word_tags(request):
+    try:
+        limit = min(max(int(request.query_params.get('limit', 50)), 1), MAX_TAGS)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(tag_counts(limit))
+
+
+@extend_schema(
+    summary="Suggest words",
+    description="Headwords starting with the given prefix, for type-ahead boxes",
+    parameters=[
+        OpenApiParameter(name='q', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+                         description='Prefix to complete (case-insensitive)'),
+        OpenApiParameter(name='limit', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                         description=f'Number of suggestions, at most {MAX_SUGGESTIONS} (default 5)'),
+    ],
+    responses={200: WordSuggestionSerializer(many=True)}
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def word_suggestions(request):
+    prefix = request.query_params.get('q', '').strip()
+    if not prefix:
+        return Response([])
+    try:
+        limit = min(max(int(request.query_params.get('limit', 5)), 1), MAX_SUGGESTIONS)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(suggest_words(prefix, limit))
+
+
+@extend_schema(
+    summary="Import words",
+    description=(
+        "Upload a CSV (with a header row) or JSONL file of words as `file`. Rows are validated and "
+        "inserted in batches; existing words are skipped, or updated with `on_conflict=update`. "
+        "Returns counts, the first invalid rows and the import rate."
+    ),
+    request={'multipart/form-data': {
+        'type': 'object',
+        'properties': {
+            'file': {'type': 'string', 'format': 'binary'},
+            'format': {'type': 'string', 'enum': list(IMPORT_FORMATS)},
+            'on_conflict': {'type': 'string', 'enum': list(ON_CONFLICT)},
+        },
+    }},
+    responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT}
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+@parser_classes([MultiPartParser])
+def import_words(request):
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    format = request.data.get('format') or detect_format(upload.name)
+    on_conflict = request.data.get('on_conflict', 'skip')
+    if format not in IMPORT_FORMATS or on_conflict not in ON_CONFLICT:
+        return Response({'error': 'Unknown format or on_conflict'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to disk, and the rows are read lazily
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    report = WordImporter(on_conflict=on_conflict).run(stream, format)
+    return Response(report.as_dict())
+
 
 @extend_schema_view(
     get=extend_schema(
@@ -75,11 +218,19 @@ class WordListCreateView(generics.ListCreateAPIView):
         description="Remove a word from the database"
     )
 )
-class WordDetailView(generics.RetrieveUpdateDestroyAPIView):
+class WordDetailView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Word.objects.all()
     serializer_class = WordSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.FAST_READ_PATH:
+            return super().retrieve(request, *args, **kwargs)
+        word = WordRepository().get(self.kwargs['pk'])
+        if word is None:
+            raise Http404
+        return Response(self.get_serializer(word).data)
+
 
 @extend_schema_view(
     get=extend_schema(
@@ -94,12 +245,32 @@ class WordDetailView(generics.RetrieveUpdateDestroyAPIView):
 class UserProgressListCreateView(generics.ListCreateAPIView):
     serializer_class = UserProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserProgressPagination
 
     def get_queryset(self):
         return UserProgress.objects.filter(user_id=self.request.user.id)
 
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_PATH:
+            return super().list(request, *args, **kwargs)
+        repository = ProgressRepository()
+        page = self.paginator.paginate_documents(
+            repository, repository.list_query(request.user.id), request, view=self
+        )
+        repository.attach_words(page)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            attach_words(page)
+        return page
+
     def perform_create(self, serializer):
-        serializer.save(user_id=self.request.user.id)
+        # A new card is due right away; the due queue never matches a null schedule
+        review_schedule = serializer.validated_data.get('review_schedule') or timezone.now()
+        serializer.save(user_id=self.request.user.id, review_schedule=review_schedule)
+        attach_words([serializer.instance])
 
 
 @extend_schema_view(
@@ -127,6 +298,99 @@ class UserProgressDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return UserProgress.objects.filter(user_id=self.request.user.id)
 
+    def get_object(self):
+        progress = super().get_object()
+        attach_words([progress])
+        return progress
+
+
+@extend_schema(
+    summary="Submit reviews in bulk",
+    description=(
+        "Record a whole study session in one request: a list of `{word_id, correct, reviewed_at}` "
+        "items, applied in order with SM-2 scheduling. Cards are created on their first review. "
+        "Returns one result per item; invalid items are reported and skipped."
+    ),
+    request=BulkReviewItemSerializer(many=True),
+    responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT}
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_reviews(request):
+    if not isinstance(request.data, list):
+        return Response({'error': 'Expected a list of reviews'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(request.data) > MAX_BULK_REVIEWS:
+        return Response({'error': f'At most {MAX_BULK_REVIEWS} reviews per request'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    results = [None] * len(request.data)
+    valid = []
+    now = timezone.now()
+    for index, item in enumerate(request.data):
+        serializer = BulkReviewItemSerializer(data=item)
+        if serializer.is_valid():
+            review = dict(serializer.validated_data)
+            review.setdefault('reviewed_at', now)
+            valid.append((index, review))
+        else:
+            results[index] = {'index': index, 'status': 'invalid', 'errors': serializer.errors}
+
+    applied = apply_reviews(request.user.id, [review for _, review in valid])
+    for (index, _), result in zip(valid, applied):
+        results[index] = dict(result, index=index)
+    return Response({'results': results})
+
+
+@extend_schema(
+    summary="Reviews due",
+    description="The authenticated user's cards that are due for review, most overdue first",
+    parameters=[
+        OpenApiParameter(name='limit', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                         description=f'Number of cards, at most {MAX_DUE_REVIEWS} (default 20)'),
+    ],
+    responses={200: UserProgressSerializer(many=True)}
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def reviews_due(request):
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), MAX_DUE_REVIEWS)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    due = list(
+        UserProgress.objects.filter(user_id=request.user.id, review_schedule__lte=timezone.now())
+        .order_by('review_schedule')[:limit]
+    )
+    attach_words(due)
+    return Response(UserProgressSerializer(due, many=True).data)
+
+
+@extend_schema(
+    summary="Submit a review",
+    description=(
+        "Grade one review of a card (quality 0-5, or correct true/false) and reschedule it "
+        "with the SM-2 algorithm"
+    ),
+    request=ReviewSubmissionSerializer,
+    responses={200: UserProgressSerializer, 400: OpenApiTypes.OBJECT, 404: OpenApiTypes.OBJECT}
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def submit_review(request, word_id):
+    if not ObjectId.is_valid(word_id):
+        raise Http404
+    submission = ReviewSubmissionSerializer(data=request.data)
+    submission.is_valid(raise_exception=True)
+    quality = submission.validated_data.get('quality')
+    if quality is None:
+        quality = quality_from_correct(submission.validated_data['correct'])
+
+    progress = get_object_or_404(UserProgress, word_id=ObjectId(word_id), user_id=request.user.id)
+    save_review(progress, quality)
+    attach_words([progress])
+    return Response(UserProgressSerializer(progress).data)
+
 
 @extend_schema_view(
     post=extend_schema(
@@ -146,7 +410,7 @@ class UserRegistrationView(APIView):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             return Response({
                 'user': UserSerializer(user).data,
                 'refresh': str(refresh),
@@ -186,7 +450,7 @@ class UserLoginView(APIView):
         if username and password:
             user = authenticate(username=username, password=password)
             if user:
-                refresh = RefreshToken.for_user(user)
+                refresh = ClaimsRefreshToken.for_user(user)
                 return Response({
                     'user': UserSerializer(user).data,
                     'refresh': str(refresh),
@@ -206,7 +470,11 @@ class UserLoginView(APIView):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_profile(request):
-    serializer = UserSerializer(request.user)
+    user = request.user
+    if not isinstance(user, User):
+        # Claims-based authentication only knows the id; the profile needs the full row
+        user = get_object_or_404(User, pk=user.id)
+    serializer = UserSerializer(user)
     return Response(serializer.data)
 
 
@@ -228,16 +496,11 @@ def user_profile(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_stats(request):
-    total_words = Word.objects.count()
-    learned_words = UserProgress.objects.filter(
-        user_id=request.user.id, 
-        is_learned=True
-    ).count()
-    in_progress = UserProgress.objects.filter(
-        user_id=request.user.id, 
-        is_learned=False
-    ).count()
-    
+    db = shared_database() if settings.FAST_READ_PATH else None
+    total_words = word_count(db)
+    counters = read_counters(request.user.id, db)
+    learned_words, in_progress = counters if counters is not None else progress_breakdown(request.user.id, db)
+
     return Response({
         'total_words': total_words,
         'learned_words': learned_words,
@@ -247,21 +510,100 @@ def user_stats(request):
 
 @extend_schema_view(
     get=extend_schema(
-        summary="Generate daily sentences",
-        description="Generate daily practice sentences for vocabulary learning",
-        responses={200: OpenApiTypes.OBJECT}
+        summary="Get daily sentences",
+        description="Return today's practice sentences, generating the set on the first request of the day",
+        responses={200: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT}
     )
 )
 class GenerateDailySentencesView(APIView):
     permission_classes = [permissions.AllowAny]              # 👈 make it public
     authentication_classes = [] 
+    throttle_classes = [LLMCostThrottle]
     serializer_class = DailySentenceSerializer
     # permission_classes = [permissions.IsAuthenticated]
 
+    flights = SingleFlight()
+
+    def llm_cost(self, request):
+        if self.flights.in_flight(flight_key(request)):
+            return 0
+        return DailySentenceStore().llm_calls_needed()
+
     def get(self, request):
-        generator = DailySentenceGenerator()
-        response = generator.generate_daily()
-        # JsonResponse content is bytes, need to decode and parse
-        import json
-        content = json.loads(response.content.decode('utf-8'))
+        try:
+            # Identical requests arriving during a generation share its result
+            content = self.flights.do(flight_key(request), DailySentenceStore().get_or_generate)
+        except DailySentencesUnavailable as ex:
+            return Response({'error': str(ex)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         return Response(content)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Stream daily sentences",
+        description=(
+            "Stream today's practice sentences as NDJSON: a `meta` line, one `sentence` line "
+            "per sentence as soon as it is ready, then a `done` line"
+        ),
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR}
+    )
+)
+class StreamDailySentencesView(APIView):
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    renderer_classes = [JSONRenderer, NDJSONRenderer]
+    throttle_classes = [LLMCostThrottle]
+
+    def llm_cost(self, request):
+        # Callers arriving during a generation wait for its stored set
+        return DailySentenceStore().llm_calls_needed(streaming=True)
+
+    def get(self, request):
+        events = DailySentenceStore().stream()
+        response = StreamingHttpResponse(
+            (json.dumps(event, ensure_ascii=False) + '\n' for event in events),
+            content_type='application/x-ndjson'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # keep nginx from buffering the stream
+        return response
+
+
+@extend_schema(
+    summary="Export data",
+    description=(
+        "Stream the `words` or `progress` collection as NDJSON, one document per line. "
+        "Admin only. `since` limits the export to documents changed at or after that time "
+        "(word `updated_at`, progress `last_reviewed`) for incremental exports."
+    ),
+    parameters=[
+        OpenApiParameter(name='since', type=OpenApiTypes.DATETIME, location=OpenApiParameter.QUERY,
+                         description='ISO datetime; only documents changed since then'),
+        OpenApiParameter(name='compress', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+                         description='`gzip` to download a compressed file'),
+    ],
+    responses={(200, 'application/x-ndjson'): OpenApiTypes.STR, 400: OpenApiTypes.OBJECT}
+)
+class ExportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [JSONRenderer, NDJSONRenderer]
+    export = None
+
+    def get(self, request):
+        since = None
+        if request.query_params.get('since'):
+            since = parse_datetime(request.query_params['since'])
+            if since is None:
+                return Response({'error': 'since must be an ISO datetime'}, status=status.HTTP_400_BAD_REQUEST)
+
+        chunks = export_lines(self.export, since=since)
+        filename = f'{self.export}.ndjson'
+        if request.query_params.get('compress') == 'gzip':
+            chunks = gzip_chunks(chunks)
+            filename += '.gz'
+            response = StreamingHttpResponse(chunks, content_type='application/gzip')
+        else:
+            response = StreamingHttpResponse(chunks, content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response